@@ -1,128 +1,226 @@
 """FastAPI app for a simple time tracking web application."""
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
+import hashlib
 import os
 from contextlib import contextmanager
 import secrets
 import threading
+import time
+from collections import OrderedDict, namedtuple
 from decimal import Decimal, ROUND_HALF_UP
-from typing import Iterable, List, Optional, Tuple
+from contextvars import ContextVar
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+# Loads the .env files into os.environ, so it must come before db.
+from env_file import ENV_SNAPSHOT as _ENV_SNAPSHOT
+
+import orjson
+from pydantic import BaseModel, ConfigDict
+
+from fastapi import FastAPI, Form, Header, Query, Request
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
+from fastapi.routing import APIRoute
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+from ldap3 import BASE, Connection, NONE, NTLM, Server, SIMPLE
+from ldap3.utils.conv import escape_filter_chars
+
+from auto_tracking import run_auto_tracking_loop_async
+from db import ensure_schema, get_connection, utc_now
+from payroll import calculate_payroll_amounts_cents, hours_fraction
+from session_middleware import FastSessionMiddleware
+
 
 def _env_bool(name: str, default: bool = False) -> bool:
-    value = os.getenv(name)
+    value = _ENV_SNAPSHOT.get(name)
     if value is None:
         return default
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
-def _load_env_file(path: str) -> None:
-    try:
-        with open(path, "r", encoding="utf-8") as handle:
-            for raw_line in handle:
-                line = raw_line.strip()
-                if not line or line.startswith("#"):
-                    continue
-                if line.startswith("export "):
-                    line = line[7:].strip()
-                if "=" not in line:
-                    continue
-                key, value = line.split("=", 1)
-                key = key.strip()
-                value = value.strip()
-                if not key:
-                    continue
-                if (
-                    len(value) >= 2
-                    and value[0] == value[-1]
-                    and value[0] in {"'", '"'}
-                ):
-                    value = value[1:-1]
-                os.environ.setdefault(key, value)
-    except FileNotFoundError:
-        return
-    except OSError:
-        return
+def _orjson_default(value: object) -> str:
+    if isinstance(value, Decimal):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
 
 
-_load_env_file("/opt/timetracking/.env")
-_load_env_file(".env")
+class ORJSONResponse(JSONResponse):
+    def render(self, content: object) -> bytes:
+        return orjson.dumps(content, default=_orjson_default, option=orjson.OPT_NAIVE_UTC)
 
 
-from pydantic import BaseModel
+_REVALIDATE = "private, no-cache"
 
-from fastapi import FastAPI, Form, Header, Query, Request
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, Response
-from fastapi.staticfiles import StaticFiles
-from fastapi.templating import Jinja2Templates
-from ldap3 import BASE, Connection, NTLM, Server, SIMPLE
-from ldap3.utils.conv import escape_filter_chars
-from starlette.middleware.sessions import SessionMiddleware
 
-from auto_tracking import run_auto_tracking_loop
-from db import ensure_schema, get_connection
+def _etag_json_response(request: Request, content: object) -> Response:
+    # Polled endpoints: the browser revalidates every time and gets an empty
+    # 304 when nothing changed.
+    response = ORJSONResponse(content, headers={"Cache-Control": _REVALIDATE})
+    etag = f'"{hashlib.blake2b(response.body, digest_size=16).hexdigest()}"'
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers={"ETag": etag, "Cache-Control": _REVALIDATE})
+    response.headers["ETag"] = etag
+    return response
 
 
-UTC = dt.timezone.utc
+app = FastAPI(title="Easy Time Tracking", default_response_class=ORJSONResponse)
+app.add_middleware(
+    FastSessionMiddleware,
+    secret_key=_ENV_SNAPSHOT.get("SESSION_SECRET", "change-me"),
+    max_age=int(_ENV_SNAPSHOT.get("SESSION_MAX_AGE", "43200")),
+    same_site=_ENV_SNAPSHOT.get("SESSION_SAMESITE", "lax"),
+    https_only=_env_bool("SESSION_HTTPS_ONLY", False),
+)
 
 
-def _attach_utc(value: dt.datetime) -> dt.datetime:
-    if value.tzinfo is None:
-        return value.replace(tzinfo=UTC)
-    return value.astimezone(UTC)
+class _CachedStaticFiles(StaticFiles):
+    # Templates link assets through static_url(), whose ?v= content hash
+    # changes with the file, so the browser may keep them indefinitely.
+    def file_response(self, *args, **kwargs) -> Response:
+        response = super().file_response(*args, **kwargs)
+        response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
 
 
-app = FastAPI(title="Easy Time Tracking")
-app.add_middleware(
-    SessionMiddleware,
-    secret_key=os.getenv("SESSION_SECRET", "change-me"),
-    max_age=int(os.getenv("SESSION_MAX_AGE", "43200")),
-    same_site=os.getenv("SESSION_SAMESITE", "lax"),
-    https_only=_env_bool("SESSION_HTTPS_ONLY", False),
-)
-app.mount("/static", StaticFiles(directory="static"), name="static")
+app.mount("/static", _CachedStaticFiles(directory="static"), name="static")
 
 templates = Jinja2Templates(directory="templates")
+# Templates ship with the code, so skip the per-render mtime check.
+templates.env.auto_reload = False
+
+
+@lru_cache(maxsize=64)
+def _static_url(path: str) -> str:
+    with open(os.path.join("static", path), "rb") as handle:
+        digest = hashlib.blake2b(handle.read(), digest_size=6).hexdigest()
+    return f"/static/{path}?v={digest}"
+
+
+templates.env.globals["static_url"] = _static_url
+
+# PROFILE=1 enables ?profile=1 on any route, answered with a pyinstrument
+# report instead of the page. pyinstrument is only imported in that case.
+PROFILE_ENABLED = _env_bool("PROFILE", False)
+_PROFILE_SINK: ContextVar[Optional[list]] = ContextVar("_PROFILE_SINK", default=None)
+
+
+def _profiled_endpoint(endpoint):
+    if asyncio.iscoroutinefunction(endpoint):
+        return endpoint
 
-LDAP_SERVER = os.getenv("LDAP_SERVER", "ldap://ldap.landeron-swiss-movements.com")
-LDAP_BASE_DN = os.getenv("LDAP_BASE_DN", "dc=ldap,dc=landeron-swiss-movements,dc=com")
-LDAP_USER_ATTRIBUTE = os.getenv("LDAP_USER_ATTRIBUTE", "uid")
-LDAP_BIND_DN = os.getenv("LDAP_BIND_DN")
-LDAP_BIND_PASSWORD = os.getenv("LDAP_BIND_PASSWORD")
-LDAP_USER_DN_TEMPLATE = os.getenv("LDAP_USER_DN_TEMPLATE")
-LDAP_USER_SEARCH_BASE = os.getenv("LDAP_USER_SEARCH_BASE")
-LDAP_UPN_SUFFIX = os.getenv("LDAP_UPN_SUFFIX")
-LDAP_AUTHENTICATION = os.getenv("LDAP_AUTHENTICATION", "SIMPLE").upper()
-LDAP_ADMIN_GROUP_DN = os.getenv("LDAP_ADMIN_GROUP_DN")
+    # Sync handlers run in Starlette's worker threads, so the profiler has to
+    # be started there rather than in the middleware on the event loop.
+    @wraps(endpoint)
+    def wrapper(*args, **kwargs):
+        sink = _PROFILE_SINK.get()
+        if sink is None:
+            return endpoint(*args, **kwargs)
+        profiler = Profiler(interval=0.0005)
+        profiler.start()
+        try:
+            return endpoint(*args, **kwargs)
+        finally:
+            profiler.stop()
+            sink.append(profiler.output_html())
+
+    return wrapper
+
+
+class _ProfiledRoute(APIRoute):
+    def __init__(self, path: str, endpoint, **kwargs) -> None:
+        super().__init__(path, _profiled_endpoint(endpoint), **kwargs)
+
+
+if PROFILE_ENABLED:
+    from pyinstrument import Profiler
+
+    app.router.route_class = _ProfiledRoute
+
+    @app.middleware("http")
+    async def _profile_request(request: Request, call_next) -> Response:
+        if request.query_params.get("profile") != "1":
+            return await call_next(request)
+        sink: list = []
+        token = _PROFILE_SINK.set(sink)
+        try:
+            response = await call_next(request)
+        finally:
+            _PROFILE_SINK.reset(token)
+        return HTMLResponse(sink[0]) if sink else response
+
+LDAP_SERVER = _ENV_SNAPSHOT.get("LDAP_SERVER", "ldap://ldap.landeron-swiss-movements.com")
+LDAP_BASE_DN = _ENV_SNAPSHOT.get("LDAP_BASE_DN", "dc=ldap,dc=landeron-swiss-movements,dc=com")
+LDAP_USER_ATTRIBUTE = _ENV_SNAPSHOT.get("LDAP_USER_ATTRIBUTE", "uid")
+LDAP_BIND_DN = _ENV_SNAPSHOT.get("LDAP_BIND_DN")
+LDAP_BIND_PASSWORD = _ENV_SNAPSHOT.get("LDAP_BIND_PASSWORD")
+LDAP_USER_DN_TEMPLATE = _ENV_SNAPSHOT.get("LDAP_USER_DN_TEMPLATE")
+LDAP_USER_SEARCH_BASE = _ENV_SNAPSHOT.get("LDAP_USER_SEARCH_BASE")
+LDAP_UPN_SUFFIX = _ENV_SNAPSHOT.get("LDAP_UPN_SUFFIX")
+LDAP_AUTHENTICATION = _ENV_SNAPSHOT.get("LDAP_AUTHENTICATION", "SIMPLE").upper()
+LDAP_ADMIN_GROUP_DN = _ENV_SNAPSHOT.get("LDAP_ADMIN_GROUP_DN")
 LDAP_USE_SSL = _env_bool("LDAP_USE_SSL", LDAP_SERVER.lower().startswith("ldaps://"))
 LDAP_STARTTLS = _env_bool("LDAP_STARTTLS", False)
+LDAP_CONNECT_TIMEOUT = int(_ENV_SNAPSHOT.get("LDAP_CONNECT_TIMEOUT", "5"))
+LDAP_RECEIVE_TIMEOUT = int(_ENV_SNAPSHOT.get("LDAP_RECEIVE_TIMEOUT", "5"))
+LDAP_POOL_SIZE = int(_ENV_SNAPSHOT.get("LDAP_POOL_SIZE", "8"))
+LDAP_POOL_LIFETIME = int(_ENV_SNAPSHOT.get("LDAP_POOL_LIFETIME", "600"))
+
+_LDAP_SERVER_SINGLETON = Server(
+    LDAP_SERVER,
+    use_ssl=LDAP_USE_SSL,
+    get_info=NONE,
+    connect_timeout=LDAP_CONNECT_TIMEOUT,
+)
+_LDAP_POOL: Dict[Tuple[str, str], List[Tuple[float, Connection]]] = {}
+# Connections used only to check user passwords via rebind.
+_LDAP_AUTH_POOL: List[Tuple[float, Connection]] = []
+_LDAP_POOL_LOCK = threading.Lock()
+
+LDAP_CACHE_TTL = int(_ENV_SNAPSHOT.get("LDAP_CACHE_TTL", "300"))
+_DN_CACHE: Dict[str, Tuple[float, Optional[str]]] = {}
+_ADMIN_CACHE: Dict[str, Tuple[float, bool]] = {}
+_LDAP_CACHE_LOCK = threading.Lock()
 
 AUTO_TRACKING_ENABLED = _env_bool("AUTO_TRACKING_ENABLED", False)
-TERMINAL_API_KEY = os.getenv("TERMINAL_API_KEY", "")
+TERMINAL_API_KEY = _ENV_SNAPSHOT.get("TERMINAL_API_KEY", "")
+_TERMINAL_API_KEY_BYTES = TERMINAL_API_KEY.encode("utf-8")
+_TERMINAL_KEY_ENABLED = bool(_TERMINAL_API_KEY_BYTES)
+
 
+SessionRow = namedtuple("SessionRow", "id user_id user_name start_time end_time note source")
 
-def _serialize_session(row: dict) -> dict:
+
+def _serialize_session(row: SessionRow) -> dict:
+    # DATETIME columns hold naive UTC values, so appending the offset is enough.
+    end = row.end_time
     return {
-        "id": row["id"],
-        "user_id": row["user_id"],
-        "user_name": row["user_name"],
-        "start_time": _attach_utc(row["start_time"]).isoformat(),
-        "end_time": _attach_utc(row["end_time"]).isoformat() if row["end_time"] else None,
-        "note": row["note"],
-        "source": row.get("source"),
+        "id": row.id,
+        "user_id": row.user_id,
+        "user_name": row.user_name,
+        "start_time": row.start_time.isoformat() + "+00:00",
+        "end_time": None if end is None else end.isoformat() + "+00:00",
+        "note": row.note,
+        "source": row.source,
     }
 
 
+_NFC_UID_TABLE = str.maketrans(
+    {**{char: None for char in ":-"}, **{chr(code): chr(code - 32) for code in range(ord("a"), ord("z") + 1)}}
+)
+
+
 def _normalize_nfc_uid(value: str) -> str:
-    return (value or "").strip().replace(":", "").replace("-", "").upper()
+    return (value or "").strip().translate(_NFC_UID_TABLE)
 
 
 def _terminal_key_ok(value: Optional[str]) -> bool:
-    if not TERMINAL_API_KEY:
+    if not _TERMINAL_KEY_ENABLED or value is None:
         return False
-    if value is None:
-        return False
-    return secrets.compare_digest(value, TERMINAL_API_KEY)
+    return secrets.compare_digest(value.encode("utf-8", "ignore"), _TERMINAL_API_KEY_BYTES)
 
 
 class TerminalScanRequest(BaseModel):
@@ -131,6 +229,34 @@ class TerminalScanRequest(BaseModel):
     ts: Optional[int] = None
 
 
+class UserUpdate(BaseModel):
+    # The bulk UPDATE writes every column, so every field is required (null
+    # where allowed); a missing field must not silently clear a rate or
+    # re-activate a disabled user.
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    id: int
+    name: str
+    ldap_username: str
+    department: Optional[str]
+    role_title: Optional[str]
+    manager_id: Optional[str]
+    mac_address: Optional[str]
+    pay_type: Optional[str]
+    hourly_rate: Optional[str]
+    salary_monthly: Optional[str]
+    overtime_multiplier: Optional[str]
+    tax_rate: Optional[str]
+    social_rate: Optional[str]
+    pension_rate: Optional[str]
+    other_rate: Optional[str]
+    employer_social_rate: Optional[str]
+    employer_pension_rate: Optional[str]
+    employer_other_rate: Optional[str]
+    payment_method: Optional[str]
+    is_active: bool
+
+
 def _get_current_user_id(request: Request) -> Optional[int]:
     return request.session.get("user_id")
 
@@ -167,7 +293,8 @@ def _domain_from_base_dn(base_dn: str) -> Optional[str]:
     return ".".join(domain_parts) if domain_parts else None
 
 
-def _build_ldap_bind_candidates(username: str) -> list[str]:
+@lru_cache(maxsize=2048)
+def _build_ldap_bind_candidates(username: str) -> Tuple[str, ...]:
     candidates = []
     normalized = username.strip()
     search_base = LDAP_USER_SEARCH_BASE or LDAP_BASE_DN
@@ -181,17 +308,11 @@ def _build_ldap_bind_candidates(username: str) -> list[str]:
             candidates.append(f"{normalized}@{upn_suffix}")
     if normalized and "=" not in normalized:
         candidates.append(f"{LDAP_USER_ATTRIBUTE}={normalized},{search_base}")
+    return tuple(dict.fromkeys(candidate for candidate in candidates if candidate))
 
-    seen = set()
-    unique_candidates = []
-    for candidate in candidates:
-        if candidate and candidate not in seen:
-            seen.add(candidate)
-            unique_candidates.append(candidate)
-    return unique_candidates
 
-
-def _username_variants(username: str) -> list[str]:
+@lru_cache(maxsize=2048)
+def _username_variants(username: str) -> Tuple[str, ...]:
     candidates = []
     normalized = username.strip()
     if normalized:
@@ -200,13 +321,7 @@ def _username_variants(username: str) -> list[str]:
         candidates.append(normalized.split("\\", 1)[1])
     if "@" in normalized:
         candidates.append(normalized.split("@", 1)[0])
-    seen = set()
-    unique_candidates = []
-    for candidate in candidates:
-        if candidate and candidate not in seen:
-            seen.add(candidate)
-            unique_candidates.append(candidate)
-    return unique_candidates
+    return tuple(dict.fromkeys(candidate for candidate in candidates if candidate))
 
 
 def _authentication_strategy(username: str):
@@ -226,11 +341,10 @@ def _service_account_authentication(bind_dn: Optional[str]):
 
 
 def _ldap_server() -> Server:
-    return Server(LDAP_SERVER, use_ssl=LDAP_USE_SSL)
+    return _LDAP_SERVER_SINGLETON
 
 
-@contextmanager
-def _bound_ldap_connection(
+def _open_ldap_connection(
     server: Server,
     user: Optional[str] = None,
     password: Optional[str] = None,
@@ -242,6 +356,7 @@ def _bound_ldap_connection(
         password=password,
         authentication=authentication or SIMPLE,
         auto_bind=False,
+        receive_timeout=LDAP_RECEIVE_TIMEOUT,
     )
     try:
         if LDAP_STARTTLS and not LDAP_USE_SSL:
@@ -249,12 +364,122 @@ def _bound_ldap_connection(
             connection.start_tls()
         if not connection.bind():
             raise RuntimeError("LDAP bind failed")
+    except Exception:
+        _close_ldap_connection(connection)
+        raise
+    return connection
+
+
+def _close_ldap_connection(connection: Connection) -> None:
+    try:
+        connection.unbind()
+    except Exception:
+        pass
+
+
+@contextmanager
+def _pooled_ldap_connection(server: Server, fresh: bool = False) -> Connection:
+    key = (LDAP_SERVER, LDAP_BIND_DN or "")
+    now = time.monotonic()
+    connection = None
+    created = now
+    stale = []
+    with _LDAP_POOL_LOCK:
+        idle = _LDAP_POOL.setdefault(key, [])
+        while idle and not fresh:
+            idle_created, idle_connection = idle.pop()
+            if now - idle_created < LDAP_POOL_LIFETIME and not idle_connection.closed:
+                connection, created = idle_connection, idle_created
+                break
+            stale.append(idle_connection)
+    for stale_connection in stale:
+        _close_ldap_connection(stale_connection)
+
+    if connection is None:
+        if LDAP_BIND_DN:
+            connection = _open_ldap_connection(
+                server,
+                user=LDAP_BIND_DN,
+                password=LDAP_BIND_PASSWORD or "",
+                authentication=_service_account_authentication(LDAP_BIND_DN),
+            )
+        else:
+            connection = _open_ldap_connection(server)
+
+    healthy = False
+    try:
         yield connection
+        healthy = True
     finally:
+        if healthy:
+            with _LDAP_POOL_LOCK:
+                idle = _LDAP_POOL.setdefault(key, [])
+                if len(idle) < LDAP_POOL_SIZE:
+                    idle.append((created, connection))
+                    connection = None
+        if connection is not None:
+            _close_ldap_connection(connection)
+
+
+def _with_service_connection(server: Server, operation: Callable[[Connection], Any]) -> Any:
+    # Same as for rebinds: a pooled socket may have been dropped while idle,
+    # so a failure gets one retry on a freshly bound connection.
+    try:
+        with _pooled_ldap_connection(server) as connection:
+            return operation(connection)
+    except Exception:
+        with _pooled_ldap_connection(server, fresh=True) as connection:
+            return operation(connection)
+
+
+def _rebind_ldap_connection(
+    connection: Connection, user: str, password: str, authentication: Optional[object] = None
+) -> bool:
+    # A socket reused from the pool may have been dropped by the server while
+    # idle; that case gets one retry on a fresh socket.
+    while True:
+        fresh = connection.closed
         try:
-            connection.unbind()
+            if fresh:
+                connection.open()
+                if LDAP_STARTTLS and not LDAP_USE_SSL:
+                    connection.start_tls()
+            return bool(connection.rebind(user=user, password=password, authentication=authentication or SIMPLE))
         except Exception:
-            pass
+            _close_ldap_connection(connection)
+            if fresh:
+                return False
+
+
+@contextmanager
+def _ldap_auth_connection(server: Server) -> Connection:
+    now = time.monotonic()
+    connection = None
+    created = now
+    stale = []
+    with _LDAP_POOL_LOCK:
+        while _LDAP_AUTH_POOL:
+            idle_created, idle_connection = _LDAP_AUTH_POOL.pop()
+            if now - idle_created < LDAP_POOL_LIFETIME and not idle_connection.closed:
+                connection, created = idle_connection, idle_created
+                break
+            stale.append(idle_connection)
+    for stale_connection in stale:
+        _close_ldap_connection(stale_connection)
+
+    if connection is None:
+        connection = Connection(server, auto_bind=False, receive_timeout=LDAP_RECEIVE_TIMEOUT)
+    try:
+        yield connection
+    finally:
+        # Failed network operations close the socket, so only live ones return.
+        if not connection.closed:
+            with _LDAP_POOL_LOCK:
+                if len(_LDAP_AUTH_POOL) < LDAP_POOL_SIZE:
+                    _LDAP_AUTH_POOL.append((created, connection))
+                    connection = None
+        if connection is not None:
+            _close_ldap_connection(connection)
 
 
 def _authenticate_with_ldap(username: str, password: str) -> bool:
@@ -262,37 +487,71 @@ def _authenticate_with_ldap(username: str, password: str) -> bool:
         return False
 
     server = _ldap_server()
-    for bind_dn in _build_ldap_bind_candidates(username):
-        try:
-            with _bound_ldap_connection(
-                server,
-                user=bind_dn,
-                password=password,
-                authentication=_authentication_strategy(bind_dn),
-            ):
-                return True
-        except Exception:
-            continue
-    user_dn = _find_ldap_user_dn(server, username)
-    if user_dn:
-        try:
-            with _bound_ldap_connection(server, user=user_dn, password=password):
+    # A failed bind leaves the connection open, so every candidate is tried
+    # on one pooled socket instead of a TCP/TLS handshake per attempt.
+    with _ldap_auth_connection(server) as connection:
+        for bind_dn in _build_ldap_bind_candidates(username):
+            if _rebind_ldap_connection(connection, bind_dn, password, _authentication_strategy(bind_dn)):
                 return True
-        except Exception:
-            return False
-    return False
+        user_dn = _find_ldap_user_dn(server, username)
+        return bool(user_dn) and _rebind_ldap_connection(connection, user_dn, password)
+
+
+def _ldap_cache_key(username: str) -> str:
+    return username.strip().lower()
+
+
+def _ldap_cache_get(cache: dict, username: str):
+    key = _ldap_cache_key(username)
+    with _LDAP_CACHE_LOCK:
+        entry = cache.get(key)
+        if entry is None:
+            return False, None
+        stored_at, value = entry
+        if time.monotonic() - stored_at >= LDAP_CACHE_TTL:
+            del cache[key]
+            return False, None
+        return True, value
+
+
+def _ldap_cache_put(cache: dict, username: str, value) -> None:
+    if LDAP_CACHE_TTL <= 0:
+        return
+    with _LDAP_CACHE_LOCK:
+        cache[_ldap_cache_key(username)] = (time.monotonic(), value)
+
+
+def _invalidate_ldap_cache(username: str) -> None:
+    with _LDAP_CACHE_LOCK:
+        for candidate in _username_variants(username):
+            key = _ldap_cache_key(candidate)
+            _DN_CACHE.pop(key, None)
+            _ADMIN_CACHE.pop(key, None)
 
 
 def _is_admin_via_ldap(username: str) -> bool:
     if not LDAP_ADMIN_GROUP_DN:
         return False
+    hit, cached = _ldap_cache_get(_ADMIN_CACHE, username)
+    if hit:
+        return cached
+    try:
+        is_admin = _search_admin_membership(username)
+    except Exception:
+        return False
+    _ldap_cache_put(_ADMIN_CACHE, username, is_admin)
+    return is_admin
+
+
+def _search_admin_membership(username: str) -> bool:
     server = _ldap_server()
     username_candidates = _username_variants(username)
     if not username_candidates:
         return False
     user_dns = []
     for candidate in username_candidates:
-        user_dn = _find_ldap_user_dn(server, candidate)
+        # Errors propagate so a failed lookup is not cached as "not an admin".
+        user_dn = _lookup_ldap_user_dn(server, candidate)
         if user_dn and user_dn not in user_dns:
             user_dns.append(user_dn)
 
@@ -304,46 +563,34 @@ def _is_admin_via_ldap(username: str) -> bool:
     for candidate in username_candidates:
         filter_parts.append(f"(memberUid={escape_filter_chars(candidate)})")
     search_filter = "(|" + "".join(filter_parts) + ")"
-    try:
-        if LDAP_BIND_DN:
-            with _bound_ldap_connection(
-                server,
-                user=LDAP_BIND_DN,
-                password=LDAP_BIND_PASSWORD or "",
-                authentication=_service_account_authentication(LDAP_BIND_DN),
-            ) as connection:
-                return connection.search(
-                    LDAP_ADMIN_GROUP_DN,
-                    search_filter,
-                    search_scope=BASE,
-                    attributes=["dn"],
-                )
-        with _bound_ldap_connection(server) as connection:
-            return connection.search(
+    return _with_service_connection(
+        server,
+        lambda connection: bool(
+            connection.search(
                 LDAP_ADMIN_GROUP_DN,
                 search_filter,
                 search_scope=BASE,
                 attributes=["dn"],
             )
-    except Exception:
-        return False
+        ),
+    )
 
 def _find_ldap_user_dn(server: Server, username: str) -> Optional[str]:
     try:
-        if LDAP_BIND_DN:
-            with _bound_ldap_connection(
-                server,
-                user=LDAP_BIND_DN,
-                password=LDAP_BIND_PASSWORD or "",
-                authentication=_service_account_authentication(LDAP_BIND_DN),
-            ) as connection:
-                return _search_for_user_dn(connection, username)
-        with _bound_ldap_connection(server) as connection:
-            return _search_for_user_dn(connection, username)
+        return _lookup_ldap_user_dn(server, username)
     except Exception:
         return None
 
 
+def _lookup_ldap_user_dn(server: Server, username: str) -> Optional[str]:
+    hit, cached = _ldap_cache_get(_DN_CACHE, username)
+    if hit:
+        return cached
+    user_dn = _with_service_connection(server, lambda connection: _search_for_user_dn(connection, username))
+    _ldap_cache_put(_DN_CACHE, username, user_dn)
+    return user_dn
+
+
 def _search_for_user_dn(connection: Connection, username: str) -> Optional[str]:
     escaped_username = escape_filter_chars(username)
     search_filter = f"({LDAP_USER_ATTRIBUTE}={escaped_username})"
@@ -362,52 +609,71 @@ def _search_for_user_dn(connection: Connection, username: str) -> Optional[str]:
     return None
 
 
-def _get_user_by_ldap(username: str) -> Optional[dict]:
+_USER_COLUMNS = """
+    id, name, ldap_username, department, role_title, manager_id, mac_address,
+    pay_type, hourly_rate, salary_monthly, overtime_multiplier, tax_rate, social_rate,
+    pension_rate, other_rate, employer_social_rate, employer_pension_rate,
+    employer_other_rate, payment_method, is_active
+"""
+
+
+User = namedtuple("User", _USER_COLUMNS.replace(",", " "))
+
+
+def _select_user_by_ldap(cursor, username: str) -> Optional[User]:
+    cursor.execute(
+        f"SELECT {_USER_COLUMNS} FROM users WHERE ldap_username = %s",
+        (username,),
+    )
+    row = cursor.fetchone()
+    return User._make(row) if row else None
+
+
+def _insert_user(cursor, username: str, name: Optional[str] = None) -> Optional[User]:
+    cursor.execute(
+        """
+        INSERT INTO users (name, ldap_username) VALUES (%s, %s)
+        ON DUPLICATE KEY UPDATE id = LAST_INSERT_ID(id)
+        """,
+        (name or username, username),
+    )
+    cursor.execute(
+        f"SELECT {_USER_COLUMNS} FROM users WHERE users.id = %s",
+        (cursor.lastrowid,),
+    )
+    row = cursor.fetchone()
+    return User._make(row) if row else None
+
+
+def _get_user_by_ldap(username: str) -> Optional[User]:
     with get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(
-            """
-            SELECT id, name, ldap_username, department, role_title, manager_id, mac_address,
-                   pay_type, hourly_rate, salary_monthly, overtime_multiplier, tax_rate, social_rate,
-                   pension_rate, other_rate, employer_social_rate, employer_pension_rate,
-                   employer_other_rate, payment_method, is_active
-            FROM users
-            WHERE ldap_username = %s
-            """,
-            (username,),
-        )
-        return cursor.fetchone()
+        cursor = connection.cursor()
+        return _select_user_by_ldap(cursor, username)
 
 
-def _create_user(username: str, name: Optional[str] = None) -> dict:
+def _create_user(username: str, name: Optional[str] = None) -> User:
     with get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(
-            "INSERT INTO users (name, ldap_username) VALUES (%s, %s)",
-            (name or username, username),
-        )
+        cursor = connection.cursor()
+        row = _insert_user(cursor, username, name)
         connection.commit()
-        cursor.execute(
-            """
-            SELECT id, name, ldap_username, department, role_title, manager_id, mac_address,
-                   pay_type, hourly_rate, salary_monthly, overtime_multiplier, tax_rate, social_rate,
-                   pension_rate, other_rate, employer_social_rate, employer_pension_rate,
-                   employer_other_rate, payment_method, is_active
-            FROM users
-            WHERE users.id = %s
-            """,
-            (cursor.lastrowid,),
-        )
-        return cursor.fetchone()
+    _invalidate_user_cache()
+    return row
 
 
-def _get_or_create_user(username: str) -> dict:
-    row = _get_user_by_ldap(username)
-    if row:
-        return row
-    return _create_user(username)
+def _get_or_create_user(username: str) -> User:
+    # Always read from the database: another worker may just have
+    # deactivated the user, and login must see that at once.
+    with get_connection() as connection:
+        cursor = connection.cursor()
+        row = _select_user_by_ldap(cursor, username)
+        if not row:
+            row = _insert_user(cursor, username)
+            connection.commit()
+            _invalidate_user_cache()
+    return row
 
 
+@lru_cache(maxsize=256)
 def _parse_month_param(month_value: Optional[str]) -> Optional[Tuple[int, int]]:
     if not month_value:
         return None
@@ -422,6 +688,7 @@ def _parse_month_param(month_value: Optional[str]) -> Optional[Tuple[int, int]]:
     return None
 
 
+@lru_cache(maxsize=256)
 def _month_range(year: int, month: int) -> Tuple[dt.datetime, dt.datetime]:
     start = dt.datetime(year, month, 1)
     if month == 12:
@@ -431,43 +698,102 @@ def _month_range(year: int, month: int) -> Tuple[dt.datetime, dt.datetime]:
     return start, end
 
 
+_PDF_ESCAPE_TABLE = str.maketrans({"\\": "\\\\", "(": "\\(", ")": "\\)"})
+
+
 def _pdf_escape(text: str) -> str:
-    return text.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.translate(_PDF_ESCAPE_TABLE)
+
+
+_PDF_LINE_PREFIX = b"1 0 0 1 72 "
+_PDF_LINE_MID = b" Tm ("
+_PDF_LINE_SUFFIX = b") Tj "
+
+
+def _pdf_object(number: int, body: bytes) -> bytes:
+    return f"{number} 0 obj\n".encode("ascii") + body + b"\nendobj\n"
+
+
+def _pdf_xref_entry(offset: int) -> bytes:
+    return f"{offset:010d} 00000 n \n".encode("ascii")
+
+
+# Objects 1-4 (catalog, page tree, page, font) never change, so their bytes
+# and xref entries are built once; only the content stream is per payslip.
+_PDF_STATIC_OBJECTS = (
+    b"<< /Type /Catalog /Pages 2 0 R >>",
+    b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>",
+    b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>",
+    b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>",
+)
+_PDF_HEAD = b"%PDF-1.4\n"
+_PDF_STATIC_XREF = b"xref\n0 6\n0000000000 65535 f \n"
+for _number, _body in enumerate(_PDF_STATIC_OBJECTS, start=1):
+    _PDF_STATIC_XREF += _pdf_xref_entry(len(_PDF_HEAD))
+    _PDF_HEAD += _pdf_object(_number, _body)
+del _number, _body
 
 
-def _build_pdf(lines: List[str]) -> bytes:
-    content_lines = []
+def _build_pdf(lines: Iterable[str]) -> bytes:
+    content = bytearray(b"BT /F1 12 Tf ")
     y = 770
     for line in lines:
-        content_lines.append(f"1 0 0 1 72 {y} Tm ({_pdf_escape(line)}) Tj")
+        content += _PDF_LINE_PREFIX
+        content += str(y).encode("ascii")
+        content += _PDF_LINE_MID
+        content += _pdf_escape(line).encode("latin-1")
+        content += _PDF_LINE_SUFFIX
         y -= 16
-    content = "BT /F1 12 Tf " + " ".join(content_lines) + " ET"
-    content_bytes = content.encode("latin-1")
-
-    objects: List[bytes] = []
-    objects.append(b"<< /Type /Catalog /Pages 2 0 R >>")
-    objects.append(b"<< /Type /Pages /Kids [3 0 R] /Count 1 >>")
-    objects.append(
-        b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] /Resources << /Font << /F1 4 0 R >> >> /Contents 5 0 R >>"
+    content += b"ET"
+
+    buf = bytearray(_PDF_HEAD)
+    buf += _pdf_object(
+        5, b"<< /Length " + str(len(content)).encode("ascii") + b" >>\nstream\n" + content + b"\nendstream"
     )
-    objects.append(b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>")
-    objects.append(b"<< /Length " + str(len(content_bytes)).encode("ascii") + b" >>\nstream\n" + content_bytes + b"\nendstream")
-
-    xref = [b"0000000000 65535 f "]
-    offsets = []
-    result = b"%PDF-1.4\n"
-    for i, obj in enumerate(objects, start=1):
-        offsets.append(len(result))
-        result += f"{i} 0 obj\n".encode("ascii") + obj + b"\nendobj\n"
-
-    xref_start = len(result)
-    result += b"xref\n0 " + str(len(objects) + 1).encode("ascii") + b"\n"
-    result += xref[0] + b"\n"
-    for offset in offsets:
-        result += f"{offset:010d} 00000 n \n".encode("ascii")
-    result += b"trailer\n<< /Size " + str(len(objects) + 1).encode("ascii") + b" /Root 1 0 R >>\nstartxref\n"
-    result += str(xref_start).encode("ascii") + b"\n%%EOF\n"
-    return result
+    xref_start = len(buf)
+    buf += _PDF_STATIC_XREF
+    buf += _pdf_xref_entry(len(_PDF_HEAD))
+    buf += b"trailer\n<< /Size 6 /Root 1 0 R >>\nstartxref\n"
+    buf += str(xref_start).encode("ascii") + b"\n%%EOF\n"
+    return bytes(buf)
+
+
+_PAYSLIP_TEMPLATE = "\n".join(
+    (
+        "Payroll Statement",
+        "Company: {company_name}",
+        "Tax ID: {company_tax_id}",
+        "Address: {company_address_line1}, {company_address_line2}",
+        "Employee: {employee_name} ({employee_id})",
+        "Department: {employee_department} | Role: {employee_role}",
+        "Pay Period: {pay_period_start} to {pay_period_end}",
+        "Pay Date: {pay_date} | Method: {payment_method}",
+        "Status: {status}",
+        " ",
+        "Earnings",
+        "Base Pay: {base_pay}",
+        "Overtime: {overtime_pay}",
+        "Bonus: {bonus_amount}",
+        "Allowance: {allowance_amount}",
+        "Gross Pay: {gross_pay}",
+        " ",
+        "Deductions",
+        "Tax ({tax_rate}): {tax_amount}",
+        "Social ({social_rate}): {social_amount}",
+        "Pension ({pension_rate}): {pension_amount}",
+        "Other ({other_rate}): {other_deduction_amount}",
+        "Total Deductions: {total_deductions}",
+        " ",
+        "Net Pay: {net_pay}",
+        "YTD Gross: {ytd_gross} | YTD Net: {ytd_net}",
+    )
+)
+_render_payslip = _PAYSLIP_TEMPLATE.format_map
+
+
+def _payslip_lines(payslip_text: str, generated_at: dt.datetime) -> Iterator[str]:
+    yield from payslip_text.split("\n")
+    yield f"Generated: {generated_at.strftime('%Y-%m-%d %H:%M')} UTC"
 
 
 def _parse_datetime_local(value: str, tz_offset: int) -> Optional[dt.datetime]:
@@ -495,50 +821,88 @@ def _parse_optional_decimal(value: Optional[str]) -> Optional[Decimal]:
     except Exception:
         return None
 
+_DEC_ZERO = Decimal("0")
+_DEC_DEFAULT_OT = Decimal("1.25")
+_DECIMAL_DEFAULTS = {"0": _DEC_ZERO, "1.25": _DEC_DEFAULT_OT}
+
 def _to_decimal(value: Optional[object], default: str = "0") -> Decimal:
-    if value is None:
-        return Decimal(default)
-    if isinstance(value, Decimal):
+    value_type = type(value)
+    if value_type is Decimal:
         return value
+    if value is None or (value_type is str and not value):
+        cached = _DECIMAL_DEFAULTS.get(default)
+        return cached if cached is not None else Decimal(default)
+    if value_type is int:
+        return Decimal(value)
     return Decimal(str(value))
 
+_DEC_CENT = Decimal("0.01")
+
+# Rates and amounts repeat across requests; typed=True keeps 1 and Decimal(1) apart.
+@lru_cache(maxsize=4096, typed=True)
 def _round_money(value: Decimal) -> Decimal:
-    return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return value.quantize(_DEC_CENT, rounding=ROUND_HALF_UP)
 
+@lru_cache(maxsize=4096, typed=True)
 def _round_hours(value: Decimal) -> Decimal:
-    return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+    return value.quantize(_DEC_CENT, rounding=ROUND_HALF_UP)
+
+def _scaled_int(value: Decimal, places: int) -> int:
+    return int(value.scaleb(places).to_integral_value(rounding=ROUND_HALF_UP))
+
+def _to_cents(value: Decimal) -> int:
+    return _scaled_int(value, 2)
+
+def _to_bp(value: Decimal) -> int:
+    return _scaled_int(value, 4)
 
-def _round_rate(value: Decimal) -> Decimal:
-    return value.quantize(Decimal("0.0001"), rounding=ROUND_HALF_UP)
+def _from_cents(cents: int) -> Decimal:
+    return Decimal(cents).scaleb(-2)
 
-def _format_currency(value: Decimal) -> str:
-    return f"{_round_money(value):.2f} CHF"
+def _from_bp(bp: int) -> Decimal:
+    return Decimal(bp).scaleb(-4)
 
-def _format_rate(value: Decimal) -> str:
-    percent = (value * Decimal("100")).quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
-    return f"{percent:.2f}%"
+def _format_hundredths(value: int, suffix: str) -> str:
+    whole, fraction = divmod(abs(value), 100)
+    sign = "-" if value < 0 else ""
+    return f"{sign}{whole}.{fraction:02d}{suffix}"
 
-def _format_hours(value: Decimal) -> str:
-    return f"{value.quantize(Decimal('0.01'), rounding=ROUND_HALF_UP):.2f} h"
+def _format_cents(cents: int) -> str:
+    return _format_hundredths(cents, " CHF")
 
 def _format_date(value: dt.date) -> str:
     return value.strftime("%Y-%m-%d")
 
+@lru_cache(maxsize=256)
 def _pay_date_for_period(year: int, month: int) -> dt.date:
     return dt.date(year, month, 25)
 
 
-def _fetch_user_by_id(user_id: int) -> Optional[dict]:
-    with get_connection() as connection:
+_USER_DETAIL_COLUMNS = """
+    users.id, users.name, users.ldap_username, users.department, users.role_title,
+    users.manager_id, managers.name AS manager_name, users.mac_address,
+    users.pay_type, users.hourly_rate, users.salary_monthly, users.overtime_multiplier,
+    users.tax_rate, users.social_rate, users.pension_rate, users.other_rate,
+    users.employer_social_rate, users.employer_pension_rate, users.employer_other_rate,
+    users.payment_method, users.is_active
+"""
+
+
+@contextmanager
+def _reuse_connection(connection=None):
+    if connection is not None:
+        yield connection
+        return
+    with get_connection() as new_connection:
+        yield new_connection
+
+
+def _load_user_by_id(user_id: int, connection=None) -> Optional[dict]:
+    with _reuse_connection(connection) as connection:
         cursor = connection.cursor(dictionary=True)
         cursor.execute(
-            """
-            SELECT users.id, users.name, users.ldap_username, users.department, users.role_title,
-                   users.manager_id, managers.name AS manager_name, users.mac_address,
-                   users.pay_type, users.hourly_rate, users.salary_monthly, users.overtime_multiplier,
-                   users.tax_rate, users.social_rate, users.pension_rate, users.other_rate,
-                   users.employer_social_rate, users.employer_pension_rate, users.employer_other_rate,
-                   users.payment_method, users.is_active
+            f"""
+            SELECT {_USER_DETAIL_COLUMNS}
             FROM users
             LEFT JOIN users AS managers ON users.manager_id = managers.id
             WHERE users.id = %s
@@ -547,8 +911,8 @@ def _fetch_user_by_id(user_id: int) -> Optional[dict]:
         )
         return cursor.fetchone()
 
-def _fetch_manager_options() -> List[dict]:
-    with get_connection() as connection:
+def _load_manager_options(connection=None) -> List[dict]:
+    with _reuse_connection(connection) as connection:
         cursor = connection.cursor(dictionary=True)
         cursor.execute(
             """
@@ -561,9 +925,67 @@ def _fetch_manager_options() -> List[dict]:
         return cursor.fetchall()
 
 
-def _fetch_users_with_month_totals(start: dt.datetime, end: dt.datetime) -> List[dict]:
+USER_CACHE_SIZE = 1024
+USER_CACHE_TTL = 30
+MANAGER_OPTIONS_TTL = 60
+# Month totals also move with open sessions and auto-tracking writes, which
+# are not invalidated here, so the TTL bounds how stale the list can get.
+USER_SUMMARY_CACHE_SIZE = 24
+USER_SUMMARY_TTL = 30
+_USER_CACHE: OrderedDict[int, Tuple[float, Optional[dict]]] = OrderedDict()
+_MANAGER_OPTIONS_CACHE: List[Tuple[float, List[dict]]] = []
+_USER_SUMMARY_CACHE: OrderedDict[Tuple[dt.datetime, dt.datetime], Tuple[float, List[dict]]] = OrderedDict()
+_USER_CACHE_LOCK = threading.Lock()
+
+
+def _fetch_user_by_id(user_id: int, connection=None) -> Optional[dict]:
+    now = time.monotonic()
+    with _USER_CACHE_LOCK:
+        entry = _USER_CACHE.get(user_id)
+        if entry is not None and now - entry[0] < USER_CACHE_TTL:
+            _USER_CACHE.move_to_end(user_id)
+            return entry[1]
+    user = _load_user_by_id(user_id, connection)
+    with _USER_CACHE_LOCK:
+        _USER_CACHE[user_id] = (now, user)
+        _USER_CACHE.move_to_end(user_id)
+        while len(_USER_CACHE) > USER_CACHE_SIZE:
+            _USER_CACHE.popitem(last=False)
+    return user
+
+
+def _fetch_manager_options(connection=None) -> List[dict]:
+    now = time.monotonic()
+    with _USER_CACHE_LOCK:
+        if _MANAGER_OPTIONS_CACHE and now - _MANAGER_OPTIONS_CACHE[0][0] < MANAGER_OPTIONS_TTL:
+            return _MANAGER_OPTIONS_CACHE[0][1]
+    managers = _load_manager_options(connection)
+    with _USER_CACHE_LOCK:
+        _MANAGER_OPTIONS_CACHE[:] = [(now, managers)]
+    return managers
+
+
+def _invalidate_user_cache() -> None:
+    # Manager names are denormalised into user rows, so any user write drops every user cache.
+    with _USER_CACHE_LOCK:
+        _USER_CACHE.clear()
+        _MANAGER_OPTIONS_CACHE.clear()
+        _USER_SUMMARY_CACHE.clear()
+    _invalidate_pdf_cache()
+
+
+def _invalidate_user_summaries() -> None:
+    with _USER_CACHE_LOCK:
+        _USER_SUMMARY_CACHE.clear()
+
+
+def _fetch_admin_paycheck_rows(
+    year: int, month: int, start: dt.datetime, end: dt.datetime
+) -> List[Tuple[dict, Optional[dict]]]:
+    # Users, their month totals and the stored paycheck for the period in one
+    # round-trip. The paycheck columns follow month_seconds in each row.
     with get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
+        cursor = connection.cursor()
         cursor.execute(
             """
             SELECT users.id, users.name, users.ldap_username, users.department, users.role_title,
@@ -572,105 +994,299 @@ def _fetch_users_with_month_totals(start: dt.datetime, end: dt.datetime) -> List
                    users.tax_rate, users.social_rate, users.pension_rate, users.other_rate,
                    users.employer_social_rate, users.employer_pension_rate, users.employer_other_rate,
                    users.payment_method, users.is_active,
-                   COALESCE(SUM(TIMESTAMPDIFF(SECOND, sessions.start_time, COALESCE(sessions.end_time, UTC_TIMESTAMP()))), 0) AS month_seconds
+                   COALESCE(totals.month_seconds, 0) AS month_seconds,
+                   paychecks.*
             FROM users
-            LEFT JOIN sessions
-              ON sessions.user_id = users.id
-             AND sessions.start_time >= %s
-             AND sessions.start_time < %s
+            LEFT JOIN (
+                SELECT user_id,
+                       SUM(TIMESTAMPDIFF(SECOND, start_time, COALESCE(end_time, UTC_TIMESTAMP()))) AS month_seconds
+                FROM sessions
+                WHERE start_time >= %s
+                  AND start_time < %s
+                GROUP BY user_id
+            ) AS totals ON totals.user_id = users.id
+            LEFT JOIN paychecks
+                   ON paychecks.user_id = users.id
+                  AND paychecks.period_year = %s
+                  AND paychecks.period_month = %s
             LEFT JOIN users AS managers ON users.manager_id = managers.id
-            GROUP BY users.id, users.name, users.ldap_username, users.department, users.role_title,
-                     users.manager_id, managers.name, users.mac_address,
-                     users.pay_type, users.hourly_rate, users.salary_monthly, users.overtime_multiplier,
-                     users.tax_rate, users.social_rate, users.pension_rate, users.other_rate,
-                     users.employer_social_rate, users.employer_pension_rate, users.employer_other_rate,
-                     users.payment_method, users.is_active
             ORDER BY users.name
             """,
-            (start, end),
+            (start, end, year, month),
         )
-        return cursor.fetchall()
-
-
-def _fetch_sessions_for_user(user_id: int, start: dt.datetime, end: dt.datetime) -> List[dict]:
+        columns = cursor.column_names
+        split = columns.index("month_seconds") + 1
+        user_columns = columns[:split]
+        paycheck_columns = columns[split:]
+        rows = []
+        for row in cursor.fetchall():
+            user = dict(zip(user_columns, row[:split]))
+            paycheck = dict(zip(paycheck_columns, row[split:])) if row[split] is not None else None
+            rows.append((user, paycheck))
+        return rows
+
+
+def _load_user_summaries_with_month_totals(start: dt.datetime, end: dt.datetime) -> List[dict]:
+    # Only the columns the user list renders; rows are streamed from an
+    # unbuffered cursor instead of materialising the full result set twice.
+    # The month total is formatted here so the cached rows carry the label.
     with get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
+        cursor = connection.cursor(dictionary=True, buffered=False)
+        cursor.execute(
+            """
+            SELECT users.id, users.name, users.ldap_username, users.department, users.role_title,
+                   managers.name AS manager_name, users.mac_address, users.pay_type, users.is_active,
+                   COALESCE(totals.month_seconds, 0) AS month_seconds
+            FROM users
+            LEFT JOIN (
+                SELECT user_id,
+                       SUM(TIMESTAMPDIFF(SECOND, start_time, COALESCE(end_time, UTC_TIMESTAMP()))) AS month_seconds
+                FROM sessions
+                WHERE start_time >= %s
+                  AND start_time < %s
+                GROUP BY user_id
+            ) AS totals ON totals.user_id = users.id
+            LEFT JOIN users AS managers ON users.manager_id = managers.id
+            ORDER BY users.name
+            """,
+            (start, end),
+        )
+        rows = []
+        for row in cursor:
+            row["month_duration"] = _format_duration(int(row["month_seconds"]))
+            rows.append(row)
+        return rows
+
+
+def _fetch_user_summaries_with_month_totals(start: dt.datetime, end: dt.datetime) -> List[dict]:
+    key = (start, end)
+    now = time.monotonic()
+    with _USER_CACHE_LOCK:
+        entry = _USER_SUMMARY_CACHE.get(key)
+        if entry is not None and now - entry[0] < USER_SUMMARY_TTL:
+            _USER_SUMMARY_CACHE.move_to_end(key)
+            return entry[1]
+    users = _load_user_summaries_with_month_totals(start, end)
+    with _USER_CACHE_LOCK:
+        _USER_SUMMARY_CACHE[key] = (now, users)
+        _USER_SUMMARY_CACHE.move_to_end(key)
+        while len(_USER_SUMMARY_CACHE) > USER_SUMMARY_CACHE_SIZE:
+            _USER_SUMMARY_CACHE.popitem(last=False)
+    return users
+
+
+def _fetch_sessions_for_user(
+    user_id: int, start: dt.datetime, end: dt.datetime, connection=None
+) -> List[SessionRow]:
+    with _reuse_connection(connection) as connection:
+        cursor = connection.cursor()
         cursor.execute(
             """
             SELECT sessions.id, sessions.user_id, users.name AS user_name,
                    sessions.start_time, sessions.end_time, sessions.note, sessions.source
             FROM sessions
             JOIN users ON sessions.user_id = users.id
-            WHERE users.id = %s
+            WHERE sessions.user_id = %s
               AND sessions.start_time >= %s
               AND sessions.start_time < %s
             ORDER BY sessions.start_time DESC
             """,
             (user_id, start, end),
         )
-        return cursor.fetchall()
+        return [SessionRow._make(row) for row in cursor.fetchall()]
 
-def _fetch_paycheck(user_id: int, year: int, month: int) -> Optional[dict]:
-    with get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
+def _fetch_total_seconds_for_user(
+    user_id: int, start: dt.datetime, end: dt.datetime, now: dt.datetime, connection=None
+) -> int:
+    with _reuse_connection(connection) as connection:
+        cursor = connection.cursor()
         cursor.execute(
             """
-            SELECT *
-            FROM paychecks
-            WHERE user_id = %s AND period_year = %s AND period_month = %s
+            SELECT COALESCE(SUM(GREATEST(TIMESTAMPDIFF(SECOND, start_time, COALESCE(end_time, %s)), 0)), 0)
+            FROM sessions
+            WHERE user_id = %s
+              AND start_time >= %s
+              AND start_time < %s
             """,
-            (user_id, year, month),
+            (now, user_id, start, end),
         )
-        return cursor.fetchone()
+        return int(cursor.fetchone()[0])
+
+def _select_user_payroll_fields_with_seconds(
+    cursor, user_id: int, year: int, month: int, start: dt.datetime, end: dt.datetime, now: dt.datetime
+) -> Optional[dict]:
+    cursor.execute(
+        """
+        SELECT users.id, users.pay_type, users.hourly_rate, users.salary_monthly, users.overtime_multiplier,
+               users.tax_rate, users.social_rate, users.pension_rate, users.other_rate,
+               users.employer_social_rate, users.employer_pension_rate, users.employer_other_rate,
+               users.payment_method,
+               (
+                   SELECT COALESCE(SUM(GREATEST(TIMESTAMPDIFF(SECOND, start_time, COALESCE(end_time, %s)), 0)), 0)
+                   FROM sessions
+                   WHERE sessions.user_id = users.id
+                     AND start_time >= %s
+                     AND start_time < %s
+               ) AS month_seconds,
+               paychecks.id AS paycheck_id,
+               paychecks.content_hash AS paycheck_hash
+        FROM users
+        LEFT JOIN paychecks
+               ON paychecks.user_id = users.id
+              AND paychecks.period_year = %s
+              AND paychecks.period_month = %s
+        WHERE users.id = %s
+        """,
+        (now, start, end, year, month, user_id),
+    )
+    return cursor.fetchone()
+
+_YTD_COLUMNS = (
+    ("ytd_base_pay", "base_pay"),
+    ("ytd_overtime_pay", "overtime_pay"),
+    ("ytd_bonus", "bonus_amount"),
+    ("ytd_allowance", "allowance_amount"),
+    ("ytd_gross", "gross_pay"),
+    ("ytd_tax", "tax_amount"),
+    ("ytd_social", "social_amount"),
+    ("ytd_pension", "pension_amount"),
+    ("ytd_other", "other_deduction_amount"),
+    ("ytd_deductions", "total_deductions"),
+    ("ytd_net", "net_pay"),
+    ("ytd_hours", "total_hours"),
+)
 
-def _fetch_paychecks_for_period(year: int, month: int) -> List[dict]:
+PAYCHECK_CACHE_SIZE = 4096
+# Writes only invalidate the worker that handled them, so with several
+# workers (WEB_CONCURRENCY) the cache is off; otherwise the TTL bounds how
+# stale a payslip or YTD total can get.
+PAYCHECK_CACHE_TTL = 30 if int(_ENV_SNAPSHOT.get("WEB_CONCURRENCY") or "1") <= 1 else 0
+_PAYCHECK_CACHE: OrderedDict[Tuple[int, int], Tuple[float, List[dict]]] = OrderedDict()
+_PAYCHECK_CACHE_LOCK = threading.Lock()
+
+
+_PAYCHECKS_FOR_USER_YEAR_SQL = """
+    SELECT *
+    FROM paychecks
+    WHERE user_id = %s AND period_year = %s
+"""
+
+
+def _fetch_paychecks_for_user_year(user_id: int, year: int, connection=None) -> List[dict]:
+    key = (user_id, year)
+    with _PAYCHECK_CACHE_LOCK:
+        entry = _PAYCHECK_CACHE.get(key)
+        if entry is not None and time.monotonic() - entry[0] < PAYCHECK_CACHE_TTL:
+            _PAYCHECK_CACHE.move_to_end(key)
+            return entry[1]
+    with _reuse_connection(connection) as connection:
+        cursor = connection.cursor(dictionary=True)
+        cursor.execute(_PAYCHECKS_FOR_USER_YEAR_SQL, (user_id, year))
+        rows = cursor.fetchall()
+    _store_paychecks_for_user_year(user_id, year, rows)
+    return rows
+
+
+def _store_paychecks_for_user_year(user_id: int, year: int, rows: List[dict]) -> None:
+    if PAYCHECK_CACHE_TTL <= 0:
+        return
+    key = (user_id, year)
+    with _PAYCHECK_CACHE_LOCK:
+        _PAYCHECK_CACHE[key] = (time.monotonic(), rows)
+        _PAYCHECK_CACHE.move_to_end(key)
+        while len(_PAYCHECK_CACHE) > PAYCHECK_CACHE_SIZE:
+            _PAYCHECK_CACHE.popitem(last=False)
+
+
+def _invalidate_paycheck_cache(user_id: int, year: int) -> None:
+    with _PAYCHECK_CACHE_LOCK:
+        _PAYCHECK_CACHE.pop((user_id, year), None)
+    _invalidate_pdf_cache(user_id, year)
+
+
+def _fetch_paycheck_and_ytd(
+    user_id: int, year: int, month: int, connection=None
+) -> Tuple[Optional[dict], dict]:
+    return _paycheck_and_ytd_from_rows(_fetch_paychecks_for_user_year(user_id, year, connection), month)
+
+
+def _paycheck_and_ytd_from_rows(rows: List[dict], month: int) -> Tuple[Optional[dict], dict]:
+    paycheck = next((row for row in rows if row["period_month"] == month), None)
+    ytd = {
+        ytd_key: sum((_to_decimal(row.get(column)) for row in rows), _DEC_ZERO)
+        for ytd_key, column in _YTD_COLUMNS
+    }
+    return paycheck, ytd
+
+
+def _fetch_payroll_bundle(
+    user_id: int, year: int, month: int, start: dt.datetime, end: dt.datetime, now: dt.datetime
+) -> Tuple[Optional[dict], Optional[int], Optional[dict], dict]:
+    # User row with its month total and the year's paychecks as two result
+    # sets of one multi-statement round-trip. The session scan is skipped
+    # (month total NULL) when a stored paycheck already carries the hours.
     with get_connection() as connection:
         cursor = connection.cursor(dictionary=True)
         cursor.execute(
-            """
-            SELECT *
-            FROM paychecks
-            WHERE period_year = %s AND period_month = %s
+            f"""
+            SELECT {_USER_DETAIL_COLUMNS},
+                   CASE WHEN EXISTS (
+                       SELECT 1
+                       FROM paychecks
+                       WHERE paychecks.user_id = users.id
+                         AND paychecks.period_year = %s
+                         AND paychecks.period_month = %s
+                         AND paychecks.total_hours IS NOT NULL
+                   ) THEN NULL ELSE (
+                       SELECT COALESCE(SUM(GREATEST(TIMESTAMPDIFF(SECOND, start_time, COALESCE(end_time, %s)), 0)), 0)
+                       FROM sessions
+                       WHERE sessions.user_id = users.id
+                         AND start_time >= %s
+                         AND start_time < %s
+                   ) END AS month_seconds
+            FROM users
+            LEFT JOIN users AS managers ON users.manager_id = managers.id
+            WHERE users.id = %s;
+            {_PAYCHECKS_FOR_USER_YEAR_SQL};
             """,
-            (year, month),
+            (year, month, now, start, end, user_id, user_id, year),
+            map_results=True,
         )
-        return cursor.fetchall()
+        user_rows, paycheck_rows = (rows for _statement, rows in cursor.fetchsets())
+    if not user_rows:
+        return None, 0, None, {}
+    user = user_rows[0]
+    _store_paychecks_for_user_year(user_id, year, paycheck_rows)
+    paycheck, ytd = _paycheck_and_ytd_from_rows(paycheck_rows, month)
+    month_seconds = user.pop("month_seconds")
+    return user, None if month_seconds is None else int(month_seconds), paycheck, ytd
+
+
+_YTD_SUM_SQL = ", ".join(f"COALESCE(SUM({column}), 0) AS {ytd_key}" for ytd_key, column in _YTD_COLUMNS)
 
-def _fetch_paycheck_year_totals(user_id: int, year: int) -> dict:
+
+def _fetch_paycheck_year_totals_bulk(year: int) -> Dict[int, dict]:
     with get_connection() as connection:
         cursor = connection.cursor(dictionary=True)
         cursor.execute(
-            """
-            SELECT
-                COALESCE(SUM(base_pay), 0) AS ytd_base_pay,
-                COALESCE(SUM(overtime_pay), 0) AS ytd_overtime_pay,
-                COALESCE(SUM(bonus_amount), 0) AS ytd_bonus,
-                COALESCE(SUM(allowance_amount), 0) AS ytd_allowance,
-                COALESCE(SUM(gross_pay), 0) AS ytd_gross,
-                COALESCE(SUM(tax_amount), 0) AS ytd_tax,
-                COALESCE(SUM(social_amount), 0) AS ytd_social,
-                COALESCE(SUM(pension_amount), 0) AS ytd_pension,
-                COALESCE(SUM(other_deduction_amount), 0) AS ytd_other,
-                COALESCE(SUM(total_deductions), 0) AS ytd_deductions,
-                COALESCE(SUM(net_pay), 0) AS ytd_net,
-                COALESCE(SUM(total_hours), 0) AS ytd_hours
+            f"""
+            SELECT user_id, {_YTD_SUM_SQL}
             FROM paychecks
-            WHERE user_id = %s AND period_year = %s
+            WHERE period_year = %s
+            GROUP BY user_id
             """,
-            (user_id, year),
+            (year,),
         )
-        return cursor.fetchone() or {}
+        return {row.pop("user_id"): row for row in cursor.fetchall()}
 
 
-def _calculate_total_seconds(sessions: Iterable[dict], now: dt.datetime) -> int:
-    total = 0
-    for row in sessions:
-        start = row["start_time"]
-        end = row["end_time"] or now
-        if end < start:
-            continue
-        total += int((end - start).total_seconds())
-    return total
+def _row_seconds(row: SessionRow, now: dt.datetime) -> int:
+    start = row.start_time
+    end = row.end_time or now
+    if end < start:
+        return 0
+    delta = end - start
+    return delta.days * 86400 + delta.seconds
 
 
 def _format_duration(seconds: int) -> str:
@@ -683,57 +1299,17 @@ def _normalize_pay_type(value: Optional[str]) -> str:
         return value
     return "hourly"
 
-def _calculate_payroll_amounts(
-    pay_type: str,
-    hourly_rate: Decimal,
-    salary_monthly: Decimal,
-    total_hours: Decimal,
-    overtime_hours: Decimal,
-    overtime_multiplier: Decimal,
-    bonus_amount: Decimal,
-    allowance_amount: Decimal,
-    tax_rate: Decimal,
-    social_rate: Decimal,
-    pension_rate: Decimal,
-    other_rate: Decimal,
-    employer_social_rate: Decimal,
-    employer_pension_rate: Decimal,
-    employer_other_rate: Decimal,
-) -> dict:
-    normalized_type = _normalize_pay_type(pay_type)
-    base_pay = salary_monthly if normalized_type == "salary" else hourly_rate * total_hours
-    overtime_rate = hourly_rate * overtime_multiplier if hourly_rate > 0 else Decimal("0")
-    overtime_pay = overtime_hours * overtime_rate
-    gross_pay = base_pay + overtime_pay + bonus_amount + allowance_amount
-
-    tax_amount = gross_pay * tax_rate
-    social_amount = gross_pay * social_rate
-    pension_amount = gross_pay * pension_rate
-    other_deduction_amount = gross_pay * other_rate
-
-    total_deductions = tax_amount + social_amount + pension_amount + other_deduction_amount
-    net_pay = gross_pay - total_deductions
-
-    employer_social_amount = gross_pay * employer_social_rate
-    employer_pension_amount = gross_pay * employer_pension_rate
-    employer_other_amount = gross_pay * employer_other_rate
+_RATE_KEYS = (
+    "tax_rate",
+    "social_rate",
+    "pension_rate",
+    "other_rate",
+    "employer_social_rate",
+    "employer_pension_rate",
+    "employer_other_rate",
+)
+_YTD_MONEY_KEYS = tuple(ytd_key for ytd_key, _column in _YTD_COLUMNS if ytd_key != "ytd_hours")
 
-    return {
-        "pay_type": normalized_type,
-        "base_pay": _round_money(base_pay),
-        "overtime_rate": _round_money(overtime_rate),
-        "overtime_pay": _round_money(overtime_pay),
-        "gross_pay": _round_money(gross_pay),
-        "tax_amount": _round_money(tax_amount),
-        "social_amount": _round_money(social_amount),
-        "pension_amount": _round_money(pension_amount),
-        "other_deduction_amount": _round_money(other_deduction_amount),
-        "total_deductions": _round_money(total_deductions),
-        "net_pay": _round_money(net_pay),
-        "employer_social_amount": _round_money(employer_social_amount),
-        "employer_pension_amount": _round_money(employer_pension_amount),
-        "employer_other_amount": _round_money(employer_other_amount),
-    }
 
 def _build_payroll_context(
     user: dict,
@@ -743,46 +1319,47 @@ def _build_payroll_context(
     paycheck: Optional[dict],
     ytd: Optional[dict],
 ) -> dict:
-    pay_type = _normalize_pay_type((paycheck or user).get("pay_type"))
-    hourly_rate = _to_decimal((paycheck or user).get("hourly_rate"))
-    salary_monthly = _to_decimal((paycheck or user).get("salary_monthly"))
-    overtime_multiplier = _to_decimal((paycheck or user).get("overtime_multiplier"), "1.25")
-    overtime_hours = _to_decimal((paycheck or {}).get("overtime_hours"))
-    bonus_amount = _to_decimal((paycheck or {}).get("bonus_amount"))
-    allowance_amount = _to_decimal((paycheck or {}).get("allowance_amount"))
-    tax_rate = _to_decimal((paycheck or user).get("tax_rate"))
-    social_rate = _to_decimal((paycheck or user).get("social_rate"))
-    pension_rate = _to_decimal((paycheck or user).get("pension_rate"))
-    other_rate = _to_decimal((paycheck or user).get("other_rate"))
-    employer_social_rate = _to_decimal((paycheck or user).get("employer_social_rate"))
-    employer_pension_rate = _to_decimal((paycheck or user).get("employer_pension_rate"))
-    employer_other_rate = _to_decimal((paycheck or user).get("employer_other_rate"))
-    payment_method = (paycheck or {}).get("payment_method") or user.get("payment_method") or "Bank Transfer"
-
-    amounts = _calculate_payroll_amounts(
+    # Display-only path: everything is converted to integer cents (or basis
+    # points / hundredths of an hour) once and formatted at the edge.
+    source = paycheck or user
+    extras = paycheck or {}
+    pay_type = _normalize_pay_type(source.get("pay_type"))
+    hourly_cents = _to_cents(_to_decimal(source.get("hourly_rate")))
+    salary_cents = _to_cents(_to_decimal(source.get("salary_monthly")))
+    total_hundredths = _to_cents(total_hours)
+    hours_numerator, hours_denominator = hours_fraction(total_hours)
+    overtime_hundredths = _to_cents(_to_decimal(extras.get("overtime_hours")))
+    bonus_cents = _to_cents(_to_decimal(extras.get("bonus_amount")))
+    allowance_cents = _to_cents(_to_decimal(extras.get("allowance_amount")))
+    rates_bp = {key: _to_bp(_to_decimal(source.get(key))) for key in _RATE_KEYS}
+    payment_method = extras.get("payment_method") or user.get("payment_method") or "Bank Transfer"
+
+    amounts = calculate_payroll_amounts_cents(
         pay_type=pay_type,
-        hourly_rate=hourly_rate,
-        salary_monthly=salary_monthly,
-        total_hours=total_hours,
-        overtime_hours=overtime_hours,
-        overtime_multiplier=overtime_multiplier,
-        bonus_amount=bonus_amount,
-        allowance_amount=allowance_amount,
-        tax_rate=tax_rate,
-        social_rate=social_rate,
-        pension_rate=pension_rate,
-        other_rate=other_rate,
-        employer_social_rate=employer_social_rate,
-        employer_pension_rate=employer_pension_rate,
-        employer_other_rate=employer_other_rate,
+        hourly_rate_cents=hourly_cents,
+        salary_monthly_cents=salary_cents,
+        # Preview totals (seconds / 3600) are priced unrounded, as before.
+        total_hours_numerator=hours_numerator,
+        total_hours_denominator=hours_denominator,
+        overtime_hours_hundredths=overtime_hundredths,
+        overtime_multiplier_hundredths=_to_cents(_to_decimal(source.get("overtime_multiplier"), "1.25")),
+        bonus_cents=bonus_cents,
+        allowance_cents=allowance_cents,
+        tax_bp=rates_bp["tax_rate"],
+        social_bp=rates_bp["social_rate"],
+        pension_bp=rates_bp["pension_rate"],
+        other_bp=rates_bp["other_rate"],
+        employer_social_bp=rates_bp["employer_social_rate"],
+        employer_pension_bp=rates_bp["employer_pension_rate"],
+        employer_other_bp=rates_bp["employer_other_rate"],
     )
 
     period_start, period_end = _month_range(year, month)
     pay_date = _pay_date_for_period(year, month)
     ytd_values = ytd or {}
 
-    return {
-        "status": (paycheck or {}).get("status") or "preview",
+    context = {
+        "status": extras.get("status") or "preview",
         "company_name": "Landeron Swiss Movements",
         "company_tax_id": "TAXIDPLACEHOLDER",
         "company_address_line1": "Junkholzweg 1",
@@ -797,45 +1374,86 @@ def _build_payroll_context(
         "pay_date": _format_date(pay_date),
         "payment_method": payment_method,
         "pay_type": pay_type,
-        "hourly_rate": _format_currency(hourly_rate),
-        "salary_monthly": _format_currency(salary_monthly),
-        "total_hours": _format_hours(total_hours),
-        "overtime_hours": _format_hours(overtime_hours),
-        "overtime_rate": _format_currency(amounts["overtime_rate"]),
-        "base_pay": _format_currency(amounts["base_pay"]),
-        "overtime_pay": _format_currency(amounts["overtime_pay"]),
-        "bonus_amount": _format_currency(bonus_amount),
-        "allowance_amount": _format_currency(allowance_amount),
-        "gross_pay": _format_currency(amounts["gross_pay"]),
-        "tax_rate": _format_rate(tax_rate),
-        "social_rate": _format_rate(social_rate),
-        "pension_rate": _format_rate(pension_rate),
-        "other_rate": _format_rate(other_rate),
-        "tax_amount": _format_currency(amounts["tax_amount"]),
-        "social_amount": _format_currency(amounts["social_amount"]),
-        "pension_amount": _format_currency(amounts["pension_amount"]),
-        "other_deduction_amount": _format_currency(amounts["other_deduction_amount"]),
-        "total_deductions": _format_currency(amounts["total_deductions"]),
-        "net_pay": _format_currency(amounts["net_pay"]),
-        "employer_social_rate": _format_rate(employer_social_rate),
-        "employer_pension_rate": _format_rate(employer_pension_rate),
-        "employer_other_rate": _format_rate(employer_other_rate),
-        "employer_social_amount": _format_currency(amounts["employer_social_amount"]),
-        "employer_pension_amount": _format_currency(amounts["employer_pension_amount"]),
-        "employer_other_amount": _format_currency(amounts["employer_other_amount"]),
-        "ytd_base_pay": _format_currency(_to_decimal(ytd_values.get("ytd_base_pay"))),
-        "ytd_overtime_pay": _format_currency(_to_decimal(ytd_values.get("ytd_overtime_pay"))),
-        "ytd_bonus": _format_currency(_to_decimal(ytd_values.get("ytd_bonus"))),
-        "ytd_allowance": _format_currency(_to_decimal(ytd_values.get("ytd_allowance"))),
-        "ytd_gross": _format_currency(_to_decimal(ytd_values.get("ytd_gross"))),
-        "ytd_tax": _format_currency(_to_decimal(ytd_values.get("ytd_tax"))),
-        "ytd_social": _format_currency(_to_decimal(ytd_values.get("ytd_social"))),
-        "ytd_pension": _format_currency(_to_decimal(ytd_values.get("ytd_pension"))),
-        "ytd_other": _format_currency(_to_decimal(ytd_values.get("ytd_other"))),
-        "ytd_deductions": _format_currency(_to_decimal(ytd_values.get("ytd_deductions"))),
-        "ytd_net": _format_currency(_to_decimal(ytd_values.get("ytd_net"))),
-        "ytd_hours": _format_hours(_to_decimal(ytd_values.get("ytd_hours"))),
+        "hourly_rate": _format_cents(hourly_cents),
+        "salary_monthly": _format_cents(salary_cents),
+        "total_hours": _format_hundredths(total_hundredths, " h"),
+        "overtime_hours": _format_hundredths(overtime_hundredths, " h"),
+        "bonus_amount": _format_cents(bonus_cents),
+        "allowance_amount": _format_cents(allowance_cents),
+        "ytd_hours": _format_hundredths(_to_cents(_to_decimal(ytd_values.get("ytd_hours"))), " h"),
     }
+    # Every calculated amount and rate is rendered under its own key.
+    for key, cents in amounts.items():
+        context[key] = _format_cents(cents)
+    for key, bp in rates_bp.items():
+        context[key] = _format_hundredths(bp, "%")
+    for key in _YTD_MONEY_KEYS:
+        context[key] = _format_cents(_to_cents(_to_decimal(ytd_values.get(key))))
+    return context
+
+
+# Finished payslips of closed months that have a stored paycheck no longer
+# depend on sessions. Their rendered text is kept per month and reused while
+# the user row, the paycheck and the YTD totals loaded for the request still
+# match, so another worker's write is picked up on the next download.
+PDF_CACHE_SIZE = 256
+PDF_CACHE_TTL = 24 * 60 * 60
+_PDF_CACHE: OrderedDict[Tuple[int, int, int], Tuple[float, tuple, str, str]] = OrderedDict()
+_PDF_CACHE_LOCK = threading.Lock()
+
+
+def _invalidate_pdf_cache(user_id: Optional[int] = None, year: Optional[int] = None) -> None:
+    with _PDF_CACHE_LOCK:
+        if user_id is None:
+            _PDF_CACHE.clear()
+            return
+        for key in [key for key in _PDF_CACHE if key[0] == user_id and key[1] == year]:
+            del _PDF_CACHE[key]
+
+
+def _cached_payslip(key: Tuple[int, int, int], fingerprint: tuple) -> Optional[Tuple[str, str]]:
+    with _PDF_CACHE_LOCK:
+        entry = _PDF_CACHE.get(key)
+        if entry is None or entry[1] != fingerprint or time.monotonic() - entry[0] >= PDF_CACHE_TTL:
+            return None
+        _PDF_CACHE.move_to_end(key)
+        return entry[2], entry[3]
+
+
+def _store_payslip(key: Tuple[int, int, int], fingerprint: tuple, payslip_text: str, filename: str) -> None:
+    with _PDF_CACHE_LOCK:
+        _PDF_CACHE[key] = (time.monotonic(), fingerprint, payslip_text, filename)
+        _PDF_CACHE.move_to_end(key)
+        while len(_PDF_CACHE) > PDF_CACHE_SIZE:
+            _PDF_CACHE.popitem(last=False)
+
+
+def _render_payslip_pdf(user_id: int, year: int, month_num: int, now: dt.datetime) -> Optional[Tuple[bytes, str]]:
+    start, end = _month_range(year, month_num)
+    user, total_seconds, paycheck, ytd = _fetch_payroll_bundle(user_id, year, month_num, start, end, now)
+    if not user:
+        return None
+    key = (user_id, year, month_num)
+    fingerprint = None
+    cached = None
+    if paycheck is not None and total_seconds is None and (year, month_num) < (now.year, now.month):
+        fingerprint = (tuple(user.values()), tuple(paycheck.values()), tuple(ytd.values()))
+        cached = _cached_payslip(key, fingerprint)
+    if cached is not None:
+        payslip_text, filename = cached
+    else:
+        if paycheck and paycheck.get("total_hours") is not None:
+            total_hours = _to_decimal(paycheck["total_hours"])
+        else:
+            total_hours = _to_decimal(total_seconds) / Decimal("3600")
+        payroll = _build_payroll_context(user, year, month_num, total_hours, paycheck, ytd)
+        payslip_text = _render_payslip(payroll)
+        filename = f"lohnabrechnung_{user['ldap_username']}_{year}-{month_num:02d}.pdf"
+        if fingerprint is not None:
+            _store_payslip(key, fingerprint, payslip_text, filename)
+    # The timestamp is added per download, so cached payslips still show when they were generated.
+    return _build_pdf(_payslip_lines(payslip_text, now)), filename
+
 
 def create_user(connection, cursor, username: str) -> int:
     cursor.execute(
@@ -848,17 +1466,39 @@ def create_user(connection, cursor, username: str) -> int:
 
 
 @app.on_event("startup")
-def start_background_tasks() -> None:
+async def start_background_tasks() -> None:
     ensure_schema()
     if not AUTO_TRACKING_ENABLED:
         return
-    thread = threading.Thread(target=run_auto_tracking_loop, daemon=True)
-    thread.start()
+    app.state.auto_tracking_task = asyncio.create_task(run_auto_tracking_loop_async())
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks() -> None:
+    task = getattr(app.state, "auto_tracking_task", None)
+    if task is None:
+        return
+    task.cancel()
+    try:
+        await task
+    except asyncio.CancelledError:
+        pass
+
+
+# Handlers that never touch MySQL or LDAP are async so they skip the worker
+# threadpool, leaving its threads for requests that block on I/O.
+# The anonymous login page has no per-request content, so it is rendered once.
+_LOGIN_HTML: Optional[bytes] = None
 
 
 @app.get("/login", response_class=HTMLResponse)
-def login_form(request: Request) -> HTMLResponse:
-    return templates.TemplateResponse("login.html", {"request": request, "error": None})
+async def login_form(request: Request) -> HTMLResponse:
+    global _LOGIN_HTML
+    if _get_current_user_id(request) is not None:
+        return templates.TemplateResponse("login.html", {"request": request, "error": None})
+    if _LOGIN_HTML is None:
+        _LOGIN_HTML = templates.get_template("login.html").render({"request": request, "error": None}).encode("utf-8")
+    return HTMLResponse(content=_LOGIN_HTML)
 
 
 @app.post("/login")
@@ -873,75 +1513,95 @@ def login(request: Request, username: str = Form(...), password: str = Form(...)
     is_admin = _is_admin_via_ldap(username)
 
     user = _get_or_create_user(username)
-    if not user["is_active"]:
+    if not user.is_active:
         return templates.TemplateResponse(
             "login.html",
             {"request": request, "error": "Benutzer ist deaktiviert."},
             status_code=403,
         )
 
-    request.session["user_id"] = user["id"]
+    request.session["user_id"] = user.id
     request.session["username"] = username
     request.session["is_admin"] = is_admin
     return RedirectResponse(url="/", status_code=303)
 
 
 @app.post("/logout")
-def logout(request: Request) -> RedirectResponse:
+async def logout(request: Request) -> RedirectResponse:
+    username = _get_current_username(request)
+    if username:
+        _invalidate_ldap_cache(username)
     request.session.clear()
     return RedirectResponse(url="/login", status_code=303)
 
 
+# The dashboard shell only varies by user, admin flag and current month.
+INDEX_CACHE_SIZE = 256
+_INDEX_HTML: OrderedDict[Tuple[Optional[str], bool, int, int], bytes] = OrderedDict()
+
+
 @app.get("/", response_class=HTMLResponse)
-def index(request: Request) -> HTMLResponse:
+async def index(request: Request) -> HTMLResponse:
     redirect = _require_login(request)
     if redirect:
         return redirect
-    now = dt.datetime.utcnow()
-
-    return templates.TemplateResponse(
-        "index.html",
-        {
-            "request": request,
-            "username": _get_current_username(request),
-            "is_admin": _is_admin(request),
-            "current_year": now.year,
-            "current_month": f"{now.month:02d}",
-        },
-    )
+    now = utc_now()
+    username = _get_current_username(request)
+    is_admin = _is_admin(request)
+    key = (username, is_admin, now.year, now.month)
+    html = _INDEX_HTML.get(key)
+    if html is None:
+        html = templates.get_template("index.html").render(
+            {
+                "request": request,
+                "username": username,
+                "is_admin": is_admin,
+                "current_year": now.year,
+                "current_month": f"{now.month:02d}",
+            }
+        ).encode("utf-8")
+        _INDEX_HTML[key] = html
+        while len(_INDEX_HTML) > INDEX_CACHE_SIZE:
+            _INDEX_HTML.popitem(last=False)
+    else:
+        _INDEX_HTML.move_to_end(key)
+    return HTMLResponse(content=html)
 
 
 @app.post("/start")
-def start_session(request: Request) -> JSONResponse:
+def start_session(request: Request) -> ORJSONResponse:
     user_id = _get_current_user_id(request)
     if user_id is None:
-        return JSONResponse({"error": "unauthorized"}, status_code=401)
+        return ORJSONResponse({"error": "unauthorized"}, status_code=401)
 
-    now = dt.datetime.utcnow()
-    now_aware = _attach_utc(now)
+    now = utc_now()
     with get_connection() as connection:
         cursor = connection.cursor()
         cursor.execute(
-            "SELECT id FROM sessions WHERE user_id = %s AND end_time IS NULL",
-            (user_id,),
-        )
-        if cursor.fetchone() is None:
-            cursor.execute(
-                "INSERT INTO sessions (user_id, start_time, source) VALUES (%s, %s, %s)",
-                (user_id, now, "manual"),
+            """
+            INSERT INTO sessions (user_id, start_time, source)
+            SELECT %s, %s, %s FROM DUAL
+            WHERE NOT EXISTS (
+                SELECT 1 FROM sessions WHERE user_id = %s AND end_time IS NULL
             )
-            connection.commit()
-    return JSONResponse({"status": "started", "time": now_aware.isoformat()})
+            """,
+            (user_id, now, "manual", user_id),
+        )
+        started = cursor.rowcount > 0
+        connection.commit()
+    if not started:
+        return ORJSONResponse({"status": "already_running", "time": now})
+    _invalidate_user_summaries()
+    return ORJSONResponse({"status": "started", "time": now})
 
 
 @app.post("/stop")
-def stop_session(request: Request) -> JSONResponse:
+def stop_session(request: Request) -> ORJSONResponse:
     user_id = _get_current_user_id(request)
     if user_id is None:
-        return JSONResponse({"error": "unauthorized"}, status_code=401)
+        return ORJSONResponse({"error": "unauthorized"}, status_code=401)
 
-    now = dt.datetime.utcnow()
-    now_aware = _attach_utc(now)
+    now = utc_now()
     with get_connection() as connection:
         cursor = connection.cursor()
         cursor.execute(
@@ -953,91 +1613,56 @@ def stop_session(request: Request) -> JSONResponse:
             (now, user_id),
         )
         connection.commit()
-    return JSONResponse({"status": "stopped", "time": now_aware.isoformat()})
+    _invalidate_user_summaries()
+    return ORJSONResponse({"status": "stopped", "time": now})
 
 
 @app.post("/api/terminal/scan")
 def terminal_scan(
     payload: TerminalScanRequest,
     x_api_key: Optional[str] = Header(None, alias="X-API-Key"),
-) -> JSONResponse:
+) -> ORJSONResponse:
     if not _terminal_key_ok(x_api_key):
-        return JSONResponse({"ok": False, "error": "unauthorized"}, status_code=401)
+        return ORJSONResponse({"ok": False, "error": "unauthorized"}, status_code=401)
 
     nfc_uid = _normalize_nfc_uid(payload.uid)
     if not nfc_uid:
-        return JSONResponse({"ok": False, "error": "invalid_uid"}, status_code=400)
+        return ORJSONResponse({"ok": False, "error": "invalid_uid"}, status_code=400)
 
-    now = dt.datetime.utcnow()
-    now_aware = _attach_utc(now)
+    now = utc_now()
 
     with get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT id, name, is_active FROM users WHERE nfc_uid = %s",
-            (nfc_uid,),
+        cursor = connection.cursor()
+        # sp_nfc_scan (see db.ensure_schema) does lookup, check-in and
+        # check-out in a single round-trip.
+        result = cursor.callproc("sp_nfc_scan", (nfc_uid, now, None, None, None, None, None))
+    action, session_id, user_id, user_name, error = result[2:]
+    if error is None:
+        _invalidate_user_summaries()
+
+    if error == "unknown_card":
+        return ORJSONResponse(
+            {"ok": False, "error": "unknown_card", "uid": nfc_uid},
+            status_code=404,
         )
-        user = cursor.fetchone()
-        if not user:
-            return JSONResponse(
-                {"ok": False, "error": "unknown_card", "uid": nfc_uid},
-                status_code=404,
-            )
-        if not user["is_active"]:
-            return JSONResponse(
-                {"ok": False, "error": "user_disabled", "uid": nfc_uid},
-                status_code=403,
-            )
-
-        cursor.execute(
-            """
-            SELECT id
-            FROM sessions
-            WHERE user_id = %s AND end_time IS NULL
-            ORDER BY start_time DESC
-            LIMIT 1
-            """,
-            (user["id"],),
+    if error == "user_disabled":
+        return ORJSONResponse(
+            {"ok": False, "error": "user_disabled", "uid": nfc_uid},
+            status_code=403,
         )
-        active = cursor.fetchone()
 
-        if active is None:
-            cursor2 = connection.cursor()
-            cursor2.execute(
-                "INSERT INTO sessions (user_id, start_time, source) VALUES (%s, %s, %s)",
-                (user["id"], now, "nfc"),
-            )
-            connection.commit()
-            session_id = cursor2.lastrowid
-            return JSONResponse(
-                {
-                    "ok": True,
-                    "action": "checked_in",
-                    "status": "anwesend",
-                    "time_utc": now_aware.isoformat(),
-                    "session_id": session_id,
-                    "user": {"id": user["id"], "name": user["name"]},
-                    "message": f"IN: {user['name']}",
-                }
-            )
-
-        cursor2 = connection.cursor()
-        cursor2.execute(
-            "UPDATE sessions SET end_time = %s WHERE id = %s",
-            (now, active["id"]),
-        )
-        connection.commit()
-        return JSONResponse(
-            {
-                "ok": True,
-                "action": "checked_out",
-                "status": "abwesend",
-                "time_utc": now_aware.isoformat(),
-                "session_id": active["id"],
-                "user": {"id": user["id"], "name": user["name"]},
-                "message": f"OUT: {user['name']}",
-            }
-        )
+    checked_in = action == "checked_in"
+    return ORJSONResponse(
+        {
+            "ok": True,
+            "action": action,
+            "status": "anwesend" if checked_in else "abwesend",
+            "time_utc": now,
+            "session_id": session_id,
+            "user": {"id": user_id, "name": user_name},
+            "message": f"{'IN' if checked_in else 'OUT'}: {user_name}",
+        }
+    )
 
 
 @app.get("/sessions")
@@ -1045,10 +1670,10 @@ def list_sessions(
     request: Request,
     date: Optional[str] = Query(None),
     tz_offset: Optional[int] = Query(None),
-) -> JSONResponse:
+) -> ORJSONResponse:
     session_user_id = _get_current_user_id(request)
     if session_user_id is None:
-        return JSONResponse({"error": "unauthorized"}, status_code=401)
+        return ORJSONResponse({"error": "unauthorized"}, status_code=401)
 
     query = (
         """
@@ -1056,25 +1681,21 @@ def list_sessions(
                sessions.start_time, sessions.end_time, sessions.note, sessions.source
         FROM sessions
         JOIN users ON sessions.user_id = users.id
-        WHERE users.id = %s
+        WHERE sessions.user_id = %s
         """
     )
     params: list = [session_user_id]
     if date:
+        try:
+            start_utc = dt.datetime.strptime(date, "%Y-%m-%d")
+        except ValueError:
+            return ORJSONResponse({"error": "invalid date"}, status_code=400)
         if tz_offset is not None:
-            try:
-                start_local = dt.datetime.strptime(date, "%Y-%m-%d")
-            except ValueError:
-                return JSONResponse({"error": "invalid date"}, status_code=400)
-            end_local = start_local + dt.timedelta(days=1)
-            offset = dt.timedelta(minutes=tz_offset)
-            start_utc = start_local + offset
-            end_utc = end_local + offset
-            query += " AND sessions.start_time >= %s AND sessions.start_time < %s"
-            params.extend([start_utc, end_utc])
-        else:
-            query += " AND DATE(sessions.start_time) = %s"
-            params.append(date)
+            start_utc += dt.timedelta(minutes=tz_offset)
+        end_utc = start_utc + dt.timedelta(days=1)
+        # Plain range predicates so idx_sessions_user_start (user_id, start_time) applies.
+        query += " AND sessions.start_time >= %s AND sessions.start_time < %s"
+        params.extend([start_utc, end_utc])
     query += " ORDER BY sessions.start_time DESC"
 
     with get_connection() as connection:
@@ -1082,14 +1703,15 @@ def list_sessions(
         cursor.execute(query, params)
         sessions = cursor.fetchall()
 
-    return JSONResponse({"sessions": [_serialize_session(row) for row in sessions]})
+    # Rows already carry the public keys; orjson tags the naive UTC datetimes.
+    return _etag_json_response(request, {"sessions": sessions})
 
 
 @app.post("/note")
-def add_note(request: Request, session_id: int = Form(...), note: str = Form(...)) -> JSONResponse:
+def add_note(request: Request, session_id: int = Form(...), note: str = Form(...)) -> ORJSONResponse:
     user_id = _get_current_user_id(request)
     if user_id is None:
-        return JSONResponse({"error": "unauthorized"}, status_code=401)
+        return ORJSONResponse({"error": "unauthorized"}, status_code=401)
 
     with get_connection() as connection:
         cursor = connection.cursor()
@@ -1098,55 +1720,49 @@ def add_note(request: Request, session_id: int = Form(...), note: str = Form(...
             (note, session_id, user_id),
         )
         connection.commit()
-    return JSONResponse({"status": "updated"})
+    return ORJSONResponse({"status": "updated"})
 
 
 @app.get("/status")
-def presence_status(request: Request) -> JSONResponse:
+def presence_status(request: Request) -> ORJSONResponse:
     user_id = _get_current_user_id(request)
     if user_id is None:
-        return JSONResponse({"error": "unauthorized"}, status_code=401)
+        return ORJSONResponse({"error": "unauthorized"}, status_code=401)
 
     with get_connection() as connection:
         cursor = connection.cursor()
+        # EXISTS stops at the first idx_sessions_user_open entry and always
+        # yields exactly one row, so nothing is left unread on the connection.
         cursor.execute(
-            "SELECT id FROM sessions WHERE user_id = %s AND end_time IS NULL",
+            "SELECT EXISTS(SELECT 1 FROM sessions WHERE user_id = %s AND end_time IS NULL)",
             (user_id,),
         )
-        active = cursor.fetchone()
+        active = cursor.fetchone()[0]
 
-    return JSONResponse({"status": "anwesend" if active else "abwesend"})
+    return _etag_json_response(request, {"status": "anwesend" if active else "abwesend"})
 
 
 @app.get("/payroll", response_class=HTMLResponse)
 def payroll_page(request: Request, month: Optional[str] = Query(None)) -> HTMLResponse:
-    redirect = _require_login(request)
-    if redirect:
-        return redirect
-
-    parsed = _parse_month_param(month)
-    now = dt.datetime.utcnow()
-    year, month_num = parsed if parsed else (now.year, now.month)
     user_id = _get_current_user_id(request)
     if user_id is None:
         return RedirectResponse(url="/login", status_code=303)
 
-    user = _fetch_user_by_id(user_id)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
+    parsed = _parse_month_param(month)
+    now = utc_now()
+    year, month_num = parsed if parsed else (now.year, now.month)
 
     start, end = _month_range(year, month_num)
-    sessions = _fetch_sessions_for_user(user_id, start, end)
-    total_seconds = _calculate_total_seconds(sessions, now)
-    total_hours = _to_decimal(total_seconds) / Decimal("3600")
-    paycheck = _fetch_paycheck(user_id, year, month_num)
-    if paycheck and paycheck.get("total_hours") is not None:
-        total_hours = _to_decimal(paycheck["total_hours"])
-    if paycheck and paycheck.get("total_hours") is not None:
-        total_hours = _to_decimal(paycheck["total_hours"])
-    if paycheck and paycheck.get("total_hours") is not None:
-        total_hours = _to_decimal(paycheck["total_hours"])
-    ytd = _fetch_paycheck_year_totals(user_id, year)
+    with get_connection() as connection:
+        user = _fetch_user_by_id(user_id, connection)
+        if not user:
+            return RedirectResponse(url="/login", status_code=303)
+        paycheck, ytd = _fetch_paycheck_and_ytd(user_id, year, month_num, connection)
+        if paycheck and paycheck.get("total_hours") is not None:
+            total_hours = _to_decimal(paycheck["total_hours"])
+        else:
+            total_seconds = _fetch_total_seconds_for_user(user_id, start, end, now, connection)
+            total_hours = _to_decimal(total_seconds) / Decimal("3600")
     payroll = _build_payroll_context(user, year, month_num, total_hours, paycheck, ytd)
 
     return templates.TemplateResponse(
@@ -1167,61 +1783,18 @@ def payroll_pdf(
     request: Request,
     month: Optional[str] = Query(None),
 ) -> Response:
-    redirect = _require_login(request)
-    if redirect:
-        return redirect
-
-    parsed = _parse_month_param(month)
-    now = dt.datetime.utcnow()
-    year, month_num = parsed if parsed else (now.year, now.month)
     user_id = _get_current_user_id(request)
     if user_id is None:
         return RedirectResponse(url="/login", status_code=303)
 
-    user = _fetch_user_by_id(user_id)
-    if not user:
-        return RedirectResponse(url="/login", status_code=303)
+    parsed = _parse_month_param(month)
+    now = utc_now()
+    year, month_num = parsed if parsed else (now.year, now.month)
 
-    start, end = _month_range(year, month_num)
-    sessions = _fetch_sessions_for_user(user_id, start, end)
-    total_seconds = _calculate_total_seconds(sessions, now)
-    total_hours = _to_decimal(total_seconds) / Decimal("3600")
-    paycheck = _fetch_paycheck(user_id, year, month_num)
-    if paycheck and paycheck.get("total_hours") is not None:
-        total_hours = _to_decimal(paycheck["total_hours"])
-    ytd = _fetch_paycheck_year_totals(user_id, year)
-    payroll = _build_payroll_context(user, year, month_num, total_hours, paycheck, ytd)
-    lines = [
-        "Payroll Statement",
-        f"Company: {payroll['company_name']}",
-        f"Tax ID: {payroll['company_tax_id']}",
-        f"Address: {payroll['company_address_line1']}, {payroll['company_address_line2']}",
-        f"Employee: {payroll['employee_name']} ({payroll['employee_id']})",
-        f"Department: {payroll['employee_department']} | Role: {payroll['employee_role']}",
-        f"Pay Period: {payroll['pay_period_start']} to {payroll['pay_period_end']}",
-        f"Pay Date: {payroll['pay_date']} | Method: {payroll['payment_method']}",
-        f"Status: {payroll['status']}",
-        " ",
-        "Earnings",
-        f"Base Pay: {payroll['base_pay']}",
-        f"Overtime: {payroll['overtime_pay']}",
-        f"Bonus: {payroll['bonus_amount']}",
-        f"Allowance: {payroll['allowance_amount']}",
-        f"Gross Pay: {payroll['gross_pay']}",
-        " ",
-        "Deductions",
-        f"Tax ({payroll['tax_rate']}): {payroll['tax_amount']}",
-        f"Social ({payroll['social_rate']}): {payroll['social_amount']}",
-        f"Pension ({payroll['pension_rate']}): {payroll['pension_amount']}",
-        f"Other ({payroll['other_rate']}): {payroll['other_deduction_amount']}",
-        f"Total Deductions: {payroll['total_deductions']}",
-        " ",
-        f"Net Pay: {payroll['net_pay']}",
-        f"YTD Gross: {payroll['ytd_gross']} | YTD Net: {payroll['ytd_net']}",
-        f"Generated: {now.strftime('%Y-%m-%d %H:%M')} UTC",
-    ]
-    pdf_bytes = _build_pdf(lines)
-    filename = f"lohnabrechnung_{user['ldap_username']}_{year}-{month_num:02d}.pdf"
+    rendered = _render_payslip_pdf(user_id, year, month_num, now)
+    if rendered is None:
+        return RedirectResponse(url="/login", status_code=303)
+    pdf_bytes, filename = rendered
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
@@ -1230,7 +1803,7 @@ def payroll_pdf(
 
 
 @app.get("/admin")
-def admin_root(request: Request) -> Response:
+async def admin_root(request: Request) -> Response:
     redirect = _require_admin(request)
     if redirect:
         return redirect
@@ -1244,10 +1817,10 @@ def admin_users(request: Request, month: Optional[str] = Query(None)) -> HTMLRes
         return redirect
 
     parsed = _parse_month_param(month)
-    now = dt.datetime.utcnow()
+    now = utc_now()
     year, month_num = parsed if parsed else (now.year, now.month)
     start, end = _month_range(year, month_num)
-    users = _fetch_users_with_month_totals(start, end)
+    users = _fetch_user_summaries_with_month_totals(start, end)
     managers = _fetch_manager_options()
     total_users = len(users)
     active_users = sum(1 for user in users if user["is_active"])
@@ -1273,20 +1846,17 @@ def admin_paychecks(request: Request, month: Optional[str] = Query(None)) -> HTM
         return redirect
 
     parsed = _parse_month_param(month)
-    now = dt.datetime.utcnow()
+    now = utc_now()
     year, month_num = parsed if parsed else (now.year, now.month)
     start, end = _month_range(year, month_num)
-    users = _fetch_users_with_month_totals(start, end)
-    paychecks = _fetch_paychecks_for_period(year, month_num)
-    paychecks_by_user = {row["user_id"]: row for row in paychecks}
+    ytd_by_user = _fetch_paycheck_year_totals_bulk(year)
 
     rows = []
-    for user in users:
+    for user, paycheck in _fetch_admin_paycheck_rows(year, month_num, start, end):
         total_hours = _round_hours(_to_decimal(user.get("month_seconds")) / Decimal("3600"))
-        paycheck = paychecks_by_user.get(user["id"])
         if paycheck and paycheck.get("total_hours") is not None:
             total_hours = _to_decimal(paycheck["total_hours"])
-        payroll = _build_payroll_context(user, year, month_num, total_hours, paycheck, {})
+        payroll = _build_payroll_context(user, year, month_num, total_hours, paycheck, ytd_by_user.get(user["id"], {}))
         rows.append(
             {
                 "user": user,
@@ -1339,14 +1909,14 @@ def admin_create_user(
     normalized_pay_type = _normalize_pay_type(pay_type)
     hourly_value = _parse_optional_decimal(hourly_rate)
     salary_value = _parse_optional_decimal(salary_monthly)
-    overtime_value = _parse_optional_decimal(overtime_multiplier) or Decimal("1.25")
-    tax_value = _parse_optional_decimal(tax_rate) or Decimal("0")
-    social_value = _parse_optional_decimal(social_rate) or Decimal("0")
-    pension_value = _parse_optional_decimal(pension_rate) or Decimal("0")
-    other_value = _parse_optional_decimal(other_rate) or Decimal("0")
-    employer_social_value = _parse_optional_decimal(employer_social_rate) or Decimal("0")
-    employer_pension_value = _parse_optional_decimal(employer_pension_rate) or Decimal("0")
-    employer_other_value = _parse_optional_decimal(employer_other_rate) or Decimal("0")
+    overtime_value = _parse_optional_decimal(overtime_multiplier) or _DEC_DEFAULT_OT
+    tax_value = _parse_optional_decimal(tax_rate) or _DEC_ZERO
+    social_value = _parse_optional_decimal(social_rate) or _DEC_ZERO
+    pension_value = _parse_optional_decimal(pension_rate) or _DEC_ZERO
+    other_value = _parse_optional_decimal(other_rate) or _DEC_ZERO
+    employer_social_value = _parse_optional_decimal(employer_social_rate) or _DEC_ZERO
+    employer_pension_value = _parse_optional_decimal(employer_pension_rate) or _DEC_ZERO
+    employer_other_value = _parse_optional_decimal(employer_other_rate) or _DEC_ZERO
     with get_connection() as connection:
         cursor = connection.cursor()
         cursor.execute(
@@ -1381,6 +1951,7 @@ def admin_create_user(
             ),
         )
         connection.commit()
+    _invalidate_user_cache()
     return RedirectResponse(url="/admin/users", status_code=303)
 
 
@@ -1394,9 +1965,126 @@ def admin_toggle_user(request: Request, user_id: int) -> Response:
         cursor = connection.cursor()
         cursor.execute("UPDATE users SET is_active = NOT is_active WHERE id = %s", (user_id,))
         connection.commit()
+    _invalidate_user_cache()
     return RedirectResponse(url="/admin/users", status_code=303)
 
 
+_UPDATE_USER_SQL = """
+    UPDATE users
+    SET name = %s,
+        ldap_username = %s,
+        department = %s,
+        role_title = %s,
+        manager_id = %s,
+        mac_address = %s,
+        pay_type = %s,
+        hourly_rate = %s,
+        salary_monthly = %s,
+        overtime_multiplier = %s,
+        tax_rate = %s,
+        social_rate = %s,
+        pension_rate = %s,
+        other_rate = %s,
+        employer_social_rate = %s,
+        employer_pension_rate = %s,
+        employer_other_rate = %s,
+        payment_method = %s,
+        is_active = %s
+    WHERE id = %s
+"""
+
+USER_BULK_BATCH_SIZE = 30
+
+
+def _user_update_params(
+    user_id: int,
+    name: str,
+    ldap_username: str,
+    department: Optional[str],
+    role_title: Optional[str],
+    manager_id: Optional[str],
+    mac_address: Optional[str],
+    pay_type: Optional[str],
+    hourly_rate: Optional[str],
+    salary_monthly: Optional[str],
+    overtime_multiplier: Optional[str],
+    tax_rate: Optional[str],
+    social_rate: Optional[str],
+    pension_rate: Optional[str],
+    other_rate: Optional[str],
+    employer_social_rate: Optional[str],
+    employer_pension_rate: Optional[str],
+    employer_other_rate: Optional[str],
+    payment_method: Optional[str],
+    is_active: bool,
+) -> tuple:
+    return (
+        name,
+        ldap_username,
+        department or None,
+        role_title or None,
+        _parse_optional_int(manager_id),
+        mac_address or None,
+        _normalize_pay_type(pay_type),
+        _parse_optional_decimal(hourly_rate),
+        _parse_optional_decimal(salary_monthly),
+        _parse_optional_decimal(overtime_multiplier) or _DEC_DEFAULT_OT,
+        _parse_optional_decimal(tax_rate) or _DEC_ZERO,
+        _parse_optional_decimal(social_rate) or _DEC_ZERO,
+        _parse_optional_decimal(pension_rate) or _DEC_ZERO,
+        _parse_optional_decimal(other_rate) or _DEC_ZERO,
+        _parse_optional_decimal(employer_social_rate) or _DEC_ZERO,
+        _parse_optional_decimal(employer_pension_rate) or _DEC_ZERO,
+        _parse_optional_decimal(employer_other_rate) or _DEC_ZERO,
+        payment_method or None,
+        1 if is_active else 0,
+        user_id,
+    )
+
+
+@app.post("/admin/users/bulk")
+def admin_bulk_update_users(request: Request, payload: List[UserUpdate]) -> ORJSONResponse:
+    if _get_current_user_id(request) is None:
+        return ORJSONResponse({"error": "unauthorized"}, status_code=401)
+    if not _is_admin(request):
+        return ORJSONResponse({"error": "forbidden"}, status_code=403)
+
+    params = [
+        _user_update_params(
+            item.id,
+            item.name,
+            item.ldap_username,
+            item.department,
+            item.role_title,
+            item.manager_id,
+            item.mac_address,
+            item.pay_type,
+            item.hourly_rate,
+            item.salary_monthly,
+            item.overtime_multiplier,
+            item.tax_rate,
+            item.social_rate,
+            item.pension_rate,
+            item.other_rate,
+            item.employer_social_rate,
+            item.employer_pension_rate,
+            item.employer_other_rate,
+            item.payment_method,
+            item.is_active,
+        )
+        for item in payload
+    ]
+    updated = 0
+    with get_connection() as connection:
+        cursor = connection.cursor()
+        for offset in range(0, len(params), USER_BULK_BATCH_SIZE):
+            cursor.executemany(_UPDATE_USER_SQL, params[offset:offset + USER_BULK_BATCH_SIZE])
+            updated += cursor.rowcount
+        connection.commit()
+    _invalidate_user_cache()
+    return ORJSONResponse({"updated": updated})
+
+
 @app.post("/admin/users/{user_id}/update")
 def admin_update_user(
     request: Request,
@@ -1425,69 +2113,33 @@ def admin_update_user(
     if redirect:
         return redirect
 
-    mac_value = mac_address or None
-    manager_value = _parse_optional_int(manager_id)
-    normalized_pay_type = _normalize_pay_type(pay_type)
-    hourly_value = _parse_optional_decimal(hourly_rate)
-    salary_value = _parse_optional_decimal(salary_monthly)
-    overtime_value = _parse_optional_decimal(overtime_multiplier) or Decimal("1.25")
-    tax_value = _parse_optional_decimal(tax_rate) or Decimal("0")
-    social_value = _parse_optional_decimal(social_rate) or Decimal("0")
-    pension_value = _parse_optional_decimal(pension_rate) or Decimal("0")
-    other_value = _parse_optional_decimal(other_rate) or Decimal("0")
-    employer_social_value = _parse_optional_decimal(employer_social_rate) or Decimal("0")
-    employer_pension_value = _parse_optional_decimal(employer_pension_rate) or Decimal("0")
-    employer_other_value = _parse_optional_decimal(employer_other_rate) or Decimal("0")
+    params = _user_update_params(
+        user_id,
+        name,
+        ldap_username,
+        department,
+        role_title,
+        manager_id,
+        mac_address,
+        pay_type,
+        hourly_rate,
+        salary_monthly,
+        overtime_multiplier,
+        tax_rate,
+        social_rate,
+        pension_rate,
+        other_rate,
+        employer_social_rate,
+        employer_pension_rate,
+        employer_other_rate,
+        payment_method,
+        bool(is_active),
+    )
     with get_connection() as connection:
         cursor = connection.cursor()
-        cursor.execute(
-            """
-            UPDATE users
-            SET name = %s,
-                ldap_username = %s,
-                department = %s,
-                role_title = %s,
-                manager_id = %s,
-                mac_address = %s,
-                pay_type = %s,
-                hourly_rate = %s,
-                salary_monthly = %s,
-                overtime_multiplier = %s,
-                tax_rate = %s,
-                social_rate = %s,
-                pension_rate = %s,
-                other_rate = %s,
-                employer_social_rate = %s,
-                employer_pension_rate = %s,
-                employer_other_rate = %s,
-                payment_method = %s,
-                is_active = %s
-            WHERE id = %s
-            """,
-            (
-                name,
-                ldap_username,
-                department or None,
-                role_title or None,
-                manager_value,
-                mac_value,
-                normalized_pay_type,
-                hourly_value,
-                salary_value,
-                overtime_value,
-                tax_value,
-                social_value,
-                pension_value,
-                other_value,
-                employer_social_value,
-                employer_pension_value,
-                employer_other_value,
-                payment_method or None,
-                1 if is_active else 0,
-                user_id,
-            ),
-        )
+        cursor.execute(_UPDATE_USER_SQL, params)
         connection.commit()
+    _invalidate_user_cache()
     return RedirectResponse(url=f"/admin/users/{user_id}", status_code=303)
 
 
@@ -1497,22 +2149,25 @@ def admin_user_detail(request: Request, user_id: int, month: Optional[str] = Que
     if redirect:
         return redirect
 
-    user = _fetch_user_by_id(user_id)
-    if not user:
-        return RedirectResponse(url="/admin/users", status_code=303)
-
-    managers = _fetch_manager_options()
     parsed = _parse_month_param(month)
-    now = dt.datetime.utcnow()
+    now = utc_now()
     year, month_num = parsed if parsed else (now.year, now.month)
     start, end = _month_range(year, month_num)
-    sessions = _fetch_sessions_for_user(user_id, start, end)
-    total_seconds = _calculate_total_seconds(sessions, now)
+    with get_connection() as connection:
+        user = _fetch_user_by_id(user_id, connection)
+        if not user:
+            return RedirectResponse(url="/admin/users", status_code=303)
+        managers = _fetch_manager_options(connection)
+        session_rows = _fetch_sessions_for_user(user_id, start, end, connection)
+        paycheck, ytd = _fetch_paycheck_and_ytd(user_id, year, month_num, connection)
+    serialized_sessions = []
+    total_seconds = 0
+    for row in session_rows:
+        total_seconds += _row_seconds(row, now)
+        serialized_sessions.append(_serialize_session(row))
     total_hours = _round_hours(_to_decimal(total_seconds) / Decimal("3600"))
-    paycheck = _fetch_paycheck(user_id, year, month_num)
     if paycheck and paycheck.get("total_hours") is not None:
         total_hours = _to_decimal(paycheck["total_hours"])
-    ytd = _fetch_paycheck_year_totals(user_id, year)
     payroll = _build_payroll_context(user, year, month_num, total_hours, paycheck, ytd)
     paycheck_form = {
         "overtime_hours": f"{_to_decimal((paycheck or {}).get('overtime_hours')):.2f}",
@@ -1530,7 +2185,7 @@ def admin_user_detail(request: Request, user_id: int, month: Optional[str] = Que
             "is_admin": _is_admin(request),
             "user": user,
             "managers": managers,
-            "sessions": [_serialize_session(row) for row in sessions],
+            "sessions": serialized_sessions,
             "year": year,
             "month": f"{month_num:02d}",
             "total_duration": _format_duration(total_seconds),
@@ -1566,9 +2221,174 @@ def admin_update_session(
             (start_dt, end_dt, note, session_id),
         )
         connection.commit()
+    _invalidate_user_summaries()
     return RedirectResponse(url=request.headers.get("referer", "/admin/users"), status_code=303)
 
 
+_PAYCHECK_UPSERT_SQL = """
+    INSERT INTO paychecks (
+        user_id, period_year, period_month, pay_date, pay_type, hourly_rate, salary_monthly,
+        total_hours, overtime_hours, overtime_multiplier, base_pay, overtime_pay,
+        bonus_amount, allowance_amount, gross_pay, tax_rate, social_rate, pension_rate, other_rate,
+        tax_amount, social_amount, pension_amount, other_deduction_amount, total_deductions, net_pay,
+        employer_social_rate, employer_pension_rate, employer_other_rate,
+        employer_social_amount, employer_pension_amount, employer_other_amount,
+        status, payment_method, content_hash
+    )
+    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+    ON DUPLICATE KEY UPDATE
+        pay_date = VALUES(pay_date),
+        pay_type = VALUES(pay_type),
+        hourly_rate = VALUES(hourly_rate),
+        salary_monthly = VALUES(salary_monthly),
+        total_hours = VALUES(total_hours),
+        overtime_hours = VALUES(overtime_hours),
+        overtime_multiplier = VALUES(overtime_multiplier),
+        base_pay = VALUES(base_pay),
+        overtime_pay = VALUES(overtime_pay),
+        bonus_amount = VALUES(bonus_amount),
+        allowance_amount = VALUES(allowance_amount),
+        gross_pay = VALUES(gross_pay),
+        tax_rate = VALUES(tax_rate),
+        social_rate = VALUES(social_rate),
+        pension_rate = VALUES(pension_rate),
+        other_rate = VALUES(other_rate),
+        tax_amount = VALUES(tax_amount),
+        social_amount = VALUES(social_amount),
+        pension_amount = VALUES(pension_amount),
+        other_deduction_amount = VALUES(other_deduction_amount),
+        total_deductions = VALUES(total_deductions),
+        net_pay = VALUES(net_pay),
+        employer_social_rate = VALUES(employer_social_rate),
+        employer_pension_rate = VALUES(employer_pension_rate),
+        employer_other_rate = VALUES(employer_other_rate),
+        employer_social_amount = VALUES(employer_social_amount),
+        employer_pension_amount = VALUES(employer_pension_amount),
+        employer_other_amount = VALUES(employer_other_amount),
+        status = VALUES(status),
+        payment_method = VALUES(payment_method),
+        content_hash = VALUES(content_hash)
+"""
+
+
+_PAYCHECK_UPDATE_SQL = """
+    UPDATE paychecks
+    SET pay_date = %s,
+        pay_type = %s,
+        hourly_rate = %s,
+        salary_monthly = %s,
+        total_hours = %s,
+        overtime_hours = %s,
+        overtime_multiplier = %s,
+        base_pay = %s,
+        overtime_pay = %s,
+        bonus_amount = %s,
+        allowance_amount = %s,
+        gross_pay = %s,
+        tax_rate = %s,
+        social_rate = %s,
+        pension_rate = %s,
+        other_rate = %s,
+        tax_amount = %s,
+        social_amount = %s,
+        pension_amount = %s,
+        other_deduction_amount = %s,
+        total_deductions = %s,
+        net_pay = %s,
+        employer_social_rate = %s,
+        employer_pension_rate = %s,
+        employer_other_rate = %s,
+        employer_social_amount = %s,
+        employer_pension_amount = %s,
+        employer_other_amount = %s,
+        status = %s,
+        payment_method = %s,
+        content_hash = %s
+    WHERE id = %s
+"""
+
+
+def _paycheck_row(
+    user: dict,
+    year: int,
+    month_num: int,
+    total_hours: Decimal,
+    overtime_hours: Decimal,
+    bonus_amount: Decimal,
+    allowance_amount: Decimal,
+    status: str,
+    payment_method: str,
+) -> tuple:
+    # Everything is converted to cents / basis points once; Decimals are only
+    # rebuilt for the INSERT parameters.
+    pay_type = _normalize_pay_type(user.get("pay_type"))
+    hourly_cents = _to_cents(_to_decimal(user.get("hourly_rate")))
+    salary_cents = _to_cents(_to_decimal(user.get("salary_monthly")))
+    overtime_multiplier = _to_decimal(user.get("overtime_multiplier"), "1.25")
+    bonus_cents = _to_cents(bonus_amount)
+    allowance_cents = _to_cents(allowance_amount)
+    rates_bp = {key: _to_bp(_to_decimal(user.get(key))) for key in _RATE_KEYS}
+
+    amounts = calculate_payroll_amounts_cents(
+        pay_type=pay_type,
+        hourly_rate_cents=hourly_cents,
+        salary_monthly_cents=salary_cents,
+        total_hours_numerator=_to_cents(total_hours),
+        total_hours_denominator=100,
+        overtime_hours_hundredths=_to_cents(overtime_hours),
+        overtime_multiplier_hundredths=_to_cents(overtime_multiplier),
+        bonus_cents=bonus_cents,
+        allowance_cents=allowance_cents,
+        tax_bp=rates_bp["tax_rate"],
+        social_bp=rates_bp["social_rate"],
+        pension_bp=rates_bp["pension_rate"],
+        other_bp=rates_bp["other_rate"],
+        employer_social_bp=rates_bp["employer_social_rate"],
+        employer_pension_bp=rates_bp["employer_pension_rate"],
+        employer_other_bp=rates_bp["employer_other_rate"],
+    )
+    row = (
+        user["id"],
+        year,
+        month_num,
+        _pay_date_for_period(year, month_num),
+        pay_type,
+        _from_cents(hourly_cents),
+        _from_cents(salary_cents),
+        total_hours,
+        overtime_hours,
+        overtime_multiplier,
+        _from_cents(amounts["base_pay"]),
+        _from_cents(amounts["overtime_pay"]),
+        bonus_amount,
+        allowance_amount,
+        _from_cents(amounts["gross_pay"]),
+        _from_bp(rates_bp["tax_rate"]),
+        _from_bp(rates_bp["social_rate"]),
+        _from_bp(rates_bp["pension_rate"]),
+        _from_bp(rates_bp["other_rate"]),
+        _from_cents(amounts["tax_amount"]),
+        _from_cents(amounts["social_amount"]),
+        _from_cents(amounts["pension_amount"]),
+        _from_cents(amounts["other_deduction_amount"]),
+        _from_cents(amounts["total_deductions"]),
+        _from_cents(amounts["net_pay"]),
+        _from_bp(rates_bp["employer_social_rate"]),
+        _from_bp(rates_bp["employer_pension_rate"]),
+        _from_bp(rates_bp["employer_other_rate"]),
+        _from_cents(amounts["employer_social_amount"]),
+        _from_cents(amounts["employer_pension_amount"]),
+        _from_cents(amounts["employer_other_amount"]),
+        status,
+        payment_method,
+    )
+    return row + (_paycheck_content_hash(row),)
+
+
+def _paycheck_content_hash(row: tuple) -> str:
+    return hashlib.blake2b(repr(row).encode("utf-8"), digest_size=16).hexdigest()
+
+
 @app.post("/admin/users/{user_id}/paycheck")
 def admin_save_paycheck(
     request: Request,
@@ -1589,136 +2409,80 @@ def admin_save_paycheck(
         return RedirectResponse(url=f"/admin/users/{user_id}", status_code=303)
     year, month_num = parsed
 
-    user = _fetch_user_by_id(user_id)
-    if not user:
-        return RedirectResponse(url="/admin/users", status_code=303)
-
     start, end = _month_range(year, month_num)
-    sessions = _fetch_sessions_for_user(user_id, start, end)
-    total_seconds = _calculate_total_seconds(sessions, dt.datetime.utcnow())
-    total_hours = _round_hours(_to_decimal(total_seconds) / Decimal("3600"))
+    with get_connection() as connection:
+        cursor = connection.cursor(dictionary=True)
+        user = _select_user_payroll_fields_with_seconds(
+            cursor, user_id, year, month_num, start, end, utc_now()
+        )
+        if not user:
+            return RedirectResponse(url="/admin/users", status_code=303)
+        row = _paycheck_row(
+            user,
+            year,
+            month_num,
+            total_hours=_round_hours(_to_decimal(user["month_seconds"]) / Decimal("3600")),
+            overtime_hours=_round_hours(_to_decimal(_parse_optional_decimal(overtime_hours))),
+            bonus_amount=_round_money(_to_decimal(_parse_optional_decimal(bonus_amount))),
+            allowance_amount=_round_money(_to_decimal(_parse_optional_decimal(allowance_amount))),
+            status=status if status in {"draft", "final"} else "draft",
+            payment_method=payment_method or user.get("payment_method") or "Bank Transfer",
+        )
+        if user["paycheck_id"] is not None:
+            if user["paycheck_hash"] == row[-1]:
+                # Re-save without any change: nothing to write.
+                return RedirectResponse(url=f"/admin/users/{user_id}?month={year}-{month_num:02d}", status_code=303)
+            # Known row: a primary-key UPDATE skips the duplicate-key probe.
+            cursor.execute(_PAYCHECK_UPDATE_SQL, row[3:] + (user["paycheck_id"],))
+        else:
+            cursor.execute(_PAYCHECK_UPSERT_SQL, row)
+        connection.commit()
+    _invalidate_paycheck_cache(user_id, year)
+    return RedirectResponse(url=f"/admin/users/{user_id}?month={year}-{month_num:02d}", status_code=303)
 
-    overtime_value = _round_hours(_to_decimal(_parse_optional_decimal(overtime_hours)))
-    bonus_value = _round_money(_to_decimal(_parse_optional_decimal(bonus_amount)))
-    allowance_value = _round_money(_to_decimal(_parse_optional_decimal(allowance_amount)))
-    normalized_status = status if status in {"draft", "final"} else "draft"
-    method_value = payment_method or user.get("payment_method") or "Bank Transfer"
 
-    pay_type = _normalize_pay_type(user.get("pay_type"))
-    hourly_rate = _round_money(_to_decimal(user.get("hourly_rate")))
-    salary_monthly = _round_money(_to_decimal(user.get("salary_monthly")))
-    overtime_multiplier = _to_decimal(user.get("overtime_multiplier"), "1.25")
-    tax_rate = _round_rate(_to_decimal(user.get("tax_rate")))
-    social_rate = _round_rate(_to_decimal(user.get("social_rate")))
-    pension_rate = _round_rate(_to_decimal(user.get("pension_rate")))
-    other_rate = _round_rate(_to_decimal(user.get("other_rate")))
-    employer_social_rate = _round_rate(_to_decimal(user.get("employer_social_rate")))
-    employer_pension_rate = _round_rate(_to_decimal(user.get("employer_pension_rate")))
-    employer_other_rate = _round_rate(_to_decimal(user.get("employer_other_rate")))
-
-    amounts = _calculate_payroll_amounts(
-        pay_type=pay_type,
-        hourly_rate=hourly_rate,
-        salary_monthly=salary_monthly,
-        total_hours=total_hours,
-        overtime_hours=overtime_value,
-        overtime_multiplier=overtime_multiplier,
-        bonus_amount=bonus_value,
-        allowance_amount=allowance_value,
-        tax_rate=tax_rate,
-        social_rate=social_rate,
-        pension_rate=pension_rate,
-        other_rate=other_rate,
-        employer_social_rate=employer_social_rate,
-        employer_pension_rate=employer_pension_rate,
-        employer_other_rate=employer_other_rate,
-    )
+@app.post("/admin/payroll/run")
+def admin_payroll_run(request: Request, month: str = Query(...)) -> Response:
+    redirect = _require_admin(request)
+    if redirect:
+        return redirect
 
-    pay_date = _pay_date_for_period(year, month_num)
-    with get_connection() as connection:
-        cursor = connection.cursor()
-        cursor.execute(
-            """
-            INSERT INTO paychecks (
-                user_id, period_year, period_month, pay_date, pay_type, hourly_rate, salary_monthly,
-                total_hours, overtime_hours, overtime_multiplier, base_pay, overtime_pay,
-                bonus_amount, allowance_amount, gross_pay, tax_rate, social_rate, pension_rate, other_rate,
-                tax_amount, social_amount, pension_amount, other_deduction_amount, total_deductions, net_pay,
-                employer_social_rate, employer_pension_rate, employer_other_rate,
-                employer_social_amount, employer_pension_amount, employer_other_amount,
-                status, payment_method
-            )
-            VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
-            ON DUPLICATE KEY UPDATE
-                pay_date = VALUES(pay_date),
-                pay_type = VALUES(pay_type),
-                hourly_rate = VALUES(hourly_rate),
-                salary_monthly = VALUES(salary_monthly),
-                total_hours = VALUES(total_hours),
-                overtime_hours = VALUES(overtime_hours),
-                overtime_multiplier = VALUES(overtime_multiplier),
-                base_pay = VALUES(base_pay),
-                overtime_pay = VALUES(overtime_pay),
-                bonus_amount = VALUES(bonus_amount),
-                allowance_amount = VALUES(allowance_amount),
-                gross_pay = VALUES(gross_pay),
-                tax_rate = VALUES(tax_rate),
-                social_rate = VALUES(social_rate),
-                pension_rate = VALUES(pension_rate),
-                other_rate = VALUES(other_rate),
-                tax_amount = VALUES(tax_amount),
-                social_amount = VALUES(social_amount),
-                pension_amount = VALUES(pension_amount),
-                other_deduction_amount = VALUES(other_deduction_amount),
-                total_deductions = VALUES(total_deductions),
-                net_pay = VALUES(net_pay),
-                employer_social_rate = VALUES(employer_social_rate),
-                employer_pension_rate = VALUES(employer_pension_rate),
-                employer_other_rate = VALUES(employer_other_rate),
-                employer_social_amount = VALUES(employer_social_amount),
-                employer_pension_amount = VALUES(employer_pension_amount),
-                employer_other_amount = VALUES(employer_other_amount),
-                status = VALUES(status),
-                payment_method = VALUES(payment_method)
-            """,
-            (
-                user_id,
+    parsed = _parse_month_param(month)
+    if not parsed:
+        return RedirectResponse(url="/admin/paychecks", status_code=303)
+    year, month_num = parsed
+
+    # Recompute every active user's paycheck for the month. Manual inputs of an
+    # existing draft are carried over; finalized paychecks are left untouched.
+    start, end = _month_range(year, month_num)
+    rows = []
+    for user, paycheck in _fetch_admin_paycheck_rows(year, month_num, start, end):
+        if not user["is_active"] or (paycheck and paycheck.get("status") == "final"):
+            continue
+        extras = paycheck or {}
+        rows.append(
+            _paycheck_row(
+                user,
                 year,
                 month_num,
-                pay_date,
-                pay_type,
-                hourly_rate,
-                salary_monthly,
-                total_hours,
-                overtime_value,
-                overtime_multiplier,
-                amounts["base_pay"],
-                amounts["overtime_pay"],
-                bonus_value,
-                allowance_value,
-                amounts["gross_pay"],
-                tax_rate,
-                social_rate,
-                pension_rate,
-                other_rate,
-                amounts["tax_amount"],
-                amounts["social_amount"],
-                amounts["pension_amount"],
-                amounts["other_deduction_amount"],
-                amounts["total_deductions"],
-                amounts["net_pay"],
-                employer_social_rate,
-                employer_pension_rate,
-                employer_other_rate,
-                amounts["employer_social_amount"],
-                amounts["employer_pension_amount"],
-                amounts["employer_other_amount"],
-                normalized_status,
-                method_value,
-            ),
+                total_hours=_round_hours(_to_decimal(user["month_seconds"]) / Decimal("3600")),
+                overtime_hours=_round_hours(_to_decimal(extras.get("overtime_hours"))),
+                bonus_amount=_round_money(_to_decimal(extras.get("bonus_amount"))),
+                allowance_amount=_round_money(_to_decimal(extras.get("allowance_amount"))),
+                status="draft",
+                payment_method=extras.get("payment_method") or user.get("payment_method") or "Bank Transfer",
+            )
         )
-        connection.commit()
-    return RedirectResponse(url=f"/admin/users/{user_id}?month={year}-{month_num:02d}", status_code=303)
+
+    if rows:
+        with get_connection() as connection:
+            cursor = connection.cursor()
+            # The connector rewrites this into one multi-row INSERT ... ON DUPLICATE KEY UPDATE.
+            cursor.executemany(_PAYCHECK_UPSERT_SQL, rows)
+            connection.commit()
+        for row in rows:
+            _invalidate_paycheck_cache(row[0], year)
+    return RedirectResponse(url=f"/admin/paychecks?month={year}-{month_num:02d}", status_code=303)
 
 
 @app.get("/admin/users/{user_id}/payroll/pdf")
@@ -1731,53 +2495,13 @@ def admin_payroll_pdf(
     if redirect:
         return redirect
 
-    user = _fetch_user_by_id(user_id)
-    if not user:
-        return RedirectResponse(url="/admin/users", status_code=303)
-
     parsed = _parse_month_param(month)
-    now = dt.datetime.utcnow()
+    now = utc_now()
     year, month_num = parsed if parsed else (now.year, now.month)
-    start, end = _month_range(year, month_num)
-    sessions = _fetch_sessions_for_user(user_id, start, end)
-    total_seconds = _calculate_total_seconds(sessions, now)
-    total_hours = _to_decimal(total_seconds) / Decimal("3600")
-    paycheck = _fetch_paycheck(user_id, year, month_num)
-    if paycheck and paycheck.get("total_hours") is not None:
-        total_hours = _to_decimal(paycheck["total_hours"])
-    ytd = _fetch_paycheck_year_totals(user_id, year)
-    payroll = _build_payroll_context(user, year, month_num, total_hours, paycheck, ytd)
-    lines = [
-        "Payroll Statement",
-        f"Company: {payroll['company_name']}",
-        f"Tax ID: {payroll['company_tax_id']}",
-        f"Address: {payroll['company_address_line1']}, {payroll['company_address_line2']}",
-        f"Employee: {payroll['employee_name']} ({payroll['employee_id']})",
-        f"Department: {payroll['employee_department']} | Role: {payroll['employee_role']}",
-        f"Pay Period: {payroll['pay_period_start']} to {payroll['pay_period_end']}",
-        f"Pay Date: {payroll['pay_date']} | Method: {payroll['payment_method']}",
-        f"Status: {payroll['status']}",
-        " ",
-        "Earnings",
-        f"Base Pay: {payroll['base_pay']}",
-        f"Overtime: {payroll['overtime_pay']}",
-        f"Bonus: {payroll['bonus_amount']}",
-        f"Allowance: {payroll['allowance_amount']}",
-        f"Gross Pay: {payroll['gross_pay']}",
-        " ",
-        "Deductions",
-        f"Tax ({payroll['tax_rate']}): {payroll['tax_amount']}",
-        f"Social ({payroll['social_rate']}): {payroll['social_amount']}",
-        f"Pension ({payroll['pension_rate']}): {payroll['pension_amount']}",
-        f"Other ({payroll['other_rate']}): {payroll['other_deduction_amount']}",
-        f"Total Deductions: {payroll['total_deductions']}",
-        " ",
-        f"Net Pay: {payroll['net_pay']}",
-        f"YTD Gross: {payroll['ytd_gross']} | YTD Net: {payroll['ytd_net']}",
-        f"Generated: {now.strftime('%Y-%m-%d %H:%M')} UTC",
-    ]
-    pdf_bytes = _build_pdf(lines)
-    filename = f"lohnabrechnung_{user['ldap_username']}_{year}-{month_num:02d}.pdf"
+    rendered = _render_payslip_pdf(user_id, year, month_num, now)
+    if rendered is None:
+        return RedirectResponse(url="/admin/users", status_code=303)
+    pdf_bytes, filename = rendered
     return Response(
         content=pdf_bytes,
         media_type="application/pdf",
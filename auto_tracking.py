@@ -1,124 +1,387 @@
 """Auto tracking loop using ARP scan to detect devices on the local network."""
 from __future__ import annotations
 
+import asyncio
 import datetime as dt
+import ipaddress
+import logging
+import re
 import subprocess
 import time
-from typing import Dict, Iterable, Optional, Set
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Set, Tuple
 
-from db import get_connection
+# Loads the .env files into os.environ, so it must come before db.
+from env_file import ENV_SNAPSHOT
+from db import get_connection, open_connection, utc_now
 
-SCAN_INTERVAL_SECONDS = 30
-ABSENCE_TIMEOUT_SECONDS = 120
+logger = logging.getLogger(__name__)
+
+SCAN_INTERVAL_SECONDS = int(ENV_SNAPSHOT.get("AUTO_TRACKING_INTERVAL", "30"))
+ABSENCE_TIMEOUT_SECONDS = int(ENV_SNAPSHOT.get("AUTO_TRACKING_ABSENCE_TIMEOUT", "120"))
+# An unchanged scan skips the database, but at least this often the loop
+# reconciles anyway to pick up manual stops and newly registered devices.
+RECONCILE_INTERVAL = dt.timedelta(seconds=ABSENCE_TIMEOUT_SECONDS / 2)
+LEADER_LOCK_NAME = "easy_timetracking_auto_tracking"
+# With scapy installed, a subnet here (e.g. 192.168.1.0/24) is swept with raw
+# ARP packets in-process instead of forking arp-scan on every scan. Without
+# scapy, arp-scan scans it instead, one /24 per process and several at a time.
+ARP_SCAN_CIDR = ENV_SNAPSHOT.get("AUTO_TRACKING_CIDR")
+ARP_SCAN_TIMEOUT_SECONDS = 2
+ARP_SCAN_PARALLELISM = 8
+# Broader networks would mean hundreds of arp-scan processes per cycle.
+ARP_SCAN_MIN_PREFIX = 16
+# arp-scan's default rate, shared by all processes that run at the same time.
+ARP_SCAN_BANDWIDTH_BPS = 256000
 _ARP_SCAN_FAILURE_LOGGED = False
+# Second column of a host line; the header's own "MAC:" field is not matched.
+_ARP_SCAN_MAC_RE = re.compile(rb"^\S+\s+([0-9A-Fa-f]{2}(?::[0-9A-Fa-f]{2}){5})\b", re.MULTILINE)
 
 
-def _parse_arp_scan_output(output: str) -> Set[str]:
-    """Extract MAC addresses from arp-scan output."""
-    macs: Set[str] = set()
-    for line in output.splitlines():
-        parts = line.split()
-        if len(parts) >= 2 and ":" in parts[1]:
-            macs.add(parts[1].lower())
-    return macs
+def _parse_arp_scan_output(output: bytes) -> Set[str]:
+    """Extract lower-case MAC addresses from raw arp-scan output."""
+    return {match.group(1).decode("ascii").lower() for match in _ARP_SCAN_MAC_RE.finditer(output)}
 
 
-def scan_for_macs() -> Optional[Set[str]]:
-    """Run arp-scan and return discovered MAC addresses.
+def _sweep_with_scapy(cidr: str) -> Optional[Set[str]]:
+    """ARP-sweep ``cidr`` via scapy; None if scapy or raw sockets are unavailable."""
+    try:
+        from scapy.layers.l2 import ARP, Ether
+        from scapy.sendrecv import srp
+    except ImportError:
+        return None
+    try:
+        answered, _ = srp(
+            Ether(dst="ff:ff:ff:ff:ff:ff") / ARP(pdst=cidr),
+            timeout=ARP_SCAN_TIMEOUT_SECONDS,
+            verbose=False,
+        )
+    except OSError:
+        return None
+    return {reply.hwsrc.lower() for _, reply in answered}
 
-    If arp-scan is not available, return None and rely on manual tracking.
-    """
+
+@lru_cache(maxsize=None)
+def _scan_network() -> Optional[str]:
+    """AUTO_TRACKING_CIDR if it is usable, otherwise None (scan the local net)."""
+    if not ARP_SCAN_CIDR:
+        return None
+    try:
+        network = ipaddress.ip_network(ARP_SCAN_CIDR, strict=False)
+    except ValueError:
+        logger.warning("Ignoring invalid AUTO_TRACKING_CIDR %r; scanning the local net", ARP_SCAN_CIDR)
+        return None
+    if network.prefixlen < ARP_SCAN_MIN_PREFIX:
+        logger.warning(
+            "Ignoring AUTO_TRACKING_CIDR %s (broader than /%d); scanning the local net",
+            network,
+            ARP_SCAN_MIN_PREFIX,
+        )
+        return None
+    return str(network)
+
+
+@lru_cache(maxsize=None)
+def _arp_scan_targets() -> Tuple[str, ...]:
+    """arp-scan target per process: the local net, or the scan network split into /24s."""
+    cidr = _scan_network()
+    if cidr is None:
+        return ("--localnet",)
+    network = ipaddress.ip_network(cidr)
+    if network.prefixlen >= 24:
+        return (cidr,)
+    return tuple(str(subnet) for subnet in network.subnets(new_prefix=24))
+
+
+def _arp_scan_command(target: str) -> List[str]:
+    targets = _arp_scan_targets()
+    bandwidth = ARP_SCAN_BANDWIDTH_BPS // min(len(targets), ARP_SCAN_PARALLELISM)
+    return ["arp-scan", f"--bandwidth={bandwidth}", target]
+
+
+def _run_arp_scan(target: str) -> Optional[Set[str]]:
     try:
         result = subprocess.run(
-            ["arp-scan", "--localnet"],
+            _arp_scan_command(target),
             check=True,
             capture_output=True,
-            text=True,
         )
     except (FileNotFoundError, subprocess.CalledProcessError):
         return None
-
     return _parse_arp_scan_output(result.stdout)
 
 
-def _fetch_known_users() -> Iterable[dict]:
-    with get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(
-            "SELECT id, mac_address FROM users WHERE mac_address IS NOT NULL AND is_active = 1"
-        )
-        return cursor.fetchall()
+def _merge_scans(results: List[Optional[Set[str]]]) -> Optional[Set[str]]:
+    # A partial sweep would make everyone in the failed ranges look absent.
+    if any(macs is None for macs in results):
+        return None
+    return set().union(*results)
 
 
-def _start_session_if_needed(user_id: int, now: dt.datetime) -> None:
-    with get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(
-            """
-            SELECT id
-            FROM sessions
-            WHERE user_id = %s AND end_time IS NULL
-            ORDER BY start_time DESC
-            LIMIT 1
-            """,
-            (user_id,),
-        )
-        active = cursor.fetchone()
-        if active is None:
-            cursor.execute(
-                "INSERT INTO sessions (user_id, start_time, source) VALUES (%s, %s, %s)",
-                (user_id, now, "auto"),
-            )
-            connection.commit()
+def scan_for_macs() -> Optional[Set[str]]:
+    """Sweep the network and return discovered MAC addresses.
 
+    Uses scapy when AUTO_TRACKING_CIDR is set and falls back to arp-scan.
+    If neither works, return None and rely on manual tracking.
+    """
+    cidr = _scan_network()
+    if cidr:
+        macs = _sweep_with_scapy(cidr)
+        if macs is not None:
+            return macs
+    targets = _arp_scan_targets()
+    if len(targets) == 1:
+        return _run_arp_scan(targets[0])
+    with ThreadPoolExecutor(max_workers=ARP_SCAN_PARALLELISM) as executor:
+        return _merge_scans(list(executor.map(_run_arp_scan, targets)))
 
-def _end_session_if_needed(user_id: int, now: dt.datetime) -> None:
-    with get_connection() as connection:
-        cursor = connection.cursor(dictionary=True)
-        cursor.execute(
-            """
-            SELECT id, start_time
-            FROM sessions
-            WHERE user_id = %s AND end_time IS NULL AND source = %s
-            ORDER BY start_time DESC
-            LIMIT 1
-            """,
-            (user_id, "auto"),
-        )
-        active = cursor.fetchone()
-        if active is None:
+
+async def scan_for_macs_async() -> Optional[Set[str]]:
+    """Like scan_for_macs, but waits for arp-scan without holding a thread."""
+    cidr = _scan_network()
+    if cidr:
+        macs = await asyncio.to_thread(_sweep_with_scapy, cidr)
+        if macs is not None:
+            return macs
+    slots = asyncio.Semaphore(ARP_SCAN_PARALLELISM)
+
+    async def run(target: str) -> Optional[Set[str]]:
+        async with slots:
+            try:
+                process = await asyncio.create_subprocess_exec(
+                    *_arp_scan_command(target),
+                    stdout=asyncio.subprocess.PIPE,
+                    stderr=asyncio.subprocess.DEVNULL,
+                )
+            except FileNotFoundError:
+                return None
+            try:
+                stdout, _ = await process.communicate()
+            except asyncio.CancelledError:
+                process.kill()
+                raise
+            if process.returncode != 0:
+                return None
+            return _parse_arp_scan_output(stdout)
+
+    return _merge_scans(await asyncio.gather(*(run(target) for target in _arp_scan_targets())))
+
+
+def _fetch_known_users(cursor) -> List[Tuple[int, str, Optional[int], Optional[str]]]:
+    """Known devices with their open sessions (one row per open session, if any)."""
+    cursor.execute(
+        """
+        SELECT users.id, LOWER(users.mac_address), sessions.id, sessions.source
+        FROM users
+        LEFT JOIN sessions ON sessions.user_id = users.id AND sessions.end_time IS NULL
+        WHERE users.mac_address IS NOT NULL AND users.is_active = 1
+        """
+    )
+    return cursor.fetchall()
+
+
+def _start_sessions_if_needed(cursor, user_ids: List[int], now: dt.datetime) -> None:
+    """Open an auto session for every listed user without an open session."""
+    placeholders = ", ".join(["%s"] * len(user_ids))
+    cursor.execute(
+        f"""
+        INSERT INTO sessions (user_id, start_time, source)
+        SELECT users.id, %s, %s
+        FROM users
+        WHERE users.id IN ({placeholders})
+          AND NOT EXISTS (
+              SELECT 1 FROM sessions WHERE sessions.user_id = users.id AND sessions.end_time IS NULL
+          )
+        """,
+        (now, "auto", *user_ids),
+    )
+
+
+def _end_sessions(cursor, session_ids: List[int], now: dt.datetime) -> None:
+    """Close the listed sessions unless they were closed in the meantime."""
+    placeholders = ", ".join(["%s"] * len(session_ids))
+    cursor.execute(
+        f"UPDATE sessions SET end_time = %s WHERE id IN ({placeholders}) AND end_time IS NULL",
+        (now, *session_ids),
+    )
+
+
+class LeaderLock:
+    """MySQL named lock so only one process (e.g. one uvicorn worker) scans.
+
+    The lock lives as long as its dedicated connection; if that connection
+    drops, another process picks the lock up on its next attempt.
+    """
+
+    def __init__(self, name: str = LEADER_LOCK_NAME) -> None:
+        self.name = name
+        self._connection = None
+
+    def acquire(self) -> bool:
+        try:
+            if self._connection is not None and not self._connection.is_connected():
+                self._drop_connection()
+            if self._connection is None:
+                self._connection = open_connection()
+            cursor = self._connection.cursor(buffered=True)
+            # Re-entrant for the holder, so this doubles as the liveness check.
+            cursor.execute("SELECT GET_LOCK(%s, 0)", (self.name,))
+            held = cursor.fetchone()[0] == 1
+            cursor.close()
+            return held
+        except Exception:
+            self._drop_connection()
+            return False
+
+    def release(self) -> None:
+        """Give up leadership; the server frees the lock with the connection."""
+        self._drop_connection()
+
+    def _drop_connection(self) -> None:
+        connection, self._connection = self._connection, None
+        if connection is None:
             return
-        cursor.execute(
-            "UPDATE sessions SET end_time = %s WHERE id = %s",
-            (now, active["id"]),
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+
+class ScanMemo:
+    """The last scan that was reconciled against the database."""
+
+    def __init__(self) -> None:
+        self.macs: Optional[Set[str]] = None
+        self.present: Set[int] = set()
+        self.reconciled_at: Optional[dt.datetime] = None
+
+    def covers(self, visible_macs: Optional[Set[str]], now: dt.datetime) -> bool:
+        return (
+            visible_macs is not None
+            and visible_macs == self.macs
+            and self.reconciled_at is not None
+            and now - self.reconciled_at < RECONCILE_INTERVAL
         )
-        connection.commit()
+
+
+def poll_once(last_seen_by_user: Dict[int, dt.datetime], memo: Optional[ScanMemo] = None) -> None:
+    """Scan once and open or close sessions for known devices."""
+    now = utc_now()
+    reconcile(scan_for_macs(), last_seen_by_user, now, memo or ScanMemo())
+
+
+def reconcile(
+    visible_macs: Optional[Set[str]],
+    last_seen_by_user: Dict[int, dt.datetime],
+    now: dt.datetime,
+    memo: ScanMemo,
+) -> None:
+    """Apply a scan result unless it matches the last one that reached the database."""
+    if memo.covers(visible_macs, now):
+        # Same devices as last time: nobody arrives or leaves, the present
+        # users just stay seen.
+        for user_id in memo.present:
+            last_seen_by_user[user_id] = now
+        return
+    present = apply_scan(visible_macs, last_seen_by_user, now)
+    if present is not None:
+        memo.macs = visible_macs
+        memo.present = present
+        memo.reconciled_at = now
+
+
+def apply_scan(
+    visible_macs: Optional[Set[str]], last_seen_by_user: Dict[int, dt.datetime], now: dt.datetime
+) -> Optional[Set[int]]:
+    """Open or close sessions for known devices given one scan result.
+
+    Returns the IDs of users whose device was visible, or None if the scan failed.
+    """
+    global _ARP_SCAN_FAILURE_LOGGED
+    if visible_macs is None:
+        if not _ARP_SCAN_FAILURE_LOGGED:
+            print("arp-scan unavailable; auto-tracking disabled until it succeeds.")
+            _ARP_SCAN_FAILURE_LOGGED = True
+        return None
+
+    # One connection per scan. The SELECT already knows who has an open
+    # session, so the writes only run when someone actually arrives or leaves.
+    with get_connection() as connection:
+        cursor = connection.cursor()
+        has_open: Dict[int, bool] = {}
+        present: Set[int] = set()
+        to_close: List[int] = []
+        for user_id, mac_address, session_id, source in _fetch_known_users(cursor):
+            has_open[user_id] = has_open.get(user_id, False) or session_id is not None
+            if mac_address and mac_address in visible_macs:
+                last_seen_by_user[user_id] = now
+                present.add(user_id)
+                continue
+            if session_id is None or source != "auto":
+                continue
+            last_seen = last_seen_by_user.get(user_id)
+            if last_seen is None:
+                continue
+            if now - last_seen >= dt.timedelta(seconds=ABSENCE_TIMEOUT_SECONDS):
+                to_close.append(session_id)
+        to_open = [user_id for user_id in present if not has_open[user_id]]
+        if to_open:
+            _start_sessions_if_needed(cursor, to_open, now)
+        if to_close:
+            _end_sessions(cursor, to_close, now)
+        if to_open or to_close:
+            connection.commit()
+    return present
 
 
 def run_auto_tracking_loop() -> None:
     """Continuously scan the network and manage sessions based on presence."""
-    global _ARP_SCAN_FAILURE_LOGGED
     last_seen_by_user: Dict[int, dt.datetime] = {}
-    while True:
-        now = dt.datetime.utcnow()
-        visible_macs = scan_for_macs()
-        if visible_macs is None:
-            if not _ARP_SCAN_FAILURE_LOGGED:
-                print("arp-scan unavailable; auto-tracking disabled until it succeeds.")
-                _ARP_SCAN_FAILURE_LOGGED = True
+    memo = ScanMemo()
+    leader = LeaderLock()
+    try:
+        while True:
+            try:
+                if leader.acquire():
+                    poll_once(last_seen_by_user, memo)
+                else:
+                    last_seen_by_user.clear()
+                    memo = ScanMemo()
+            except Exception:
+                logger.exception("Auto-tracking cycle failed")
             time.sleep(SCAN_INTERVAL_SECONDS)
-            continue
-        users = _fetch_known_users()
-
-        for user in users:
-            if user["mac_address"] and user["mac_address"].lower() in visible_macs:
-                last_seen_by_user[user["id"]] = now
-                _start_session_if_needed(user["id"], now)
-            else:
-                last_seen = last_seen_by_user.get(user["id"])
-                if last_seen is None:
-                    continue
-                if now - last_seen >= dt.timedelta(seconds=ABSENCE_TIMEOUT_SECONDS):
-                    _end_session_if_needed(user["id"], now)
-
-        time.sleep(SCAN_INTERVAL_SECONDS)
+    finally:
+        leader.release()
+
+
+async def run_auto_tracking_loop_async() -> None:
+    """Event-loop variant: arp-scan is awaited as a subprocess; only DB work leaves the loop."""
+    last_seen_by_user: Dict[int, dt.datetime] = {}
+    memo = ScanMemo()
+    leader = LeaderLock()
+    try:
+        while True:
+            # A failed cycle (pool exhausted, lost connection, deadlock) must not
+            # end the task, or the lock stays held and nobody scans anymore.
+            try:
+                if await asyncio.to_thread(leader.acquire):
+                    now = utc_now()
+                    visible_macs = await scan_for_macs_async()
+                    if memo.covers(visible_macs, now):
+                        reconcile(visible_macs, last_seen_by_user, now, memo)
+                    else:
+                        await asyncio.to_thread(reconcile, visible_macs, last_seen_by_user, now, memo)
+                else:
+                    # A follower's sightings go stale; start fresh if it takes over.
+                    last_seen_by_user.clear()
+                    memo = ScanMemo()
+            except Exception:
+                logger.exception("Auto-tracking cycle failed")
+            await asyncio.sleep(SCAN_INTERVAL_SECONDS)
+    finally:
+        leader.release()
+
+
+if __name__ == "__main__":
+    run_auto_tracking_loop()
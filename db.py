@@ -2,11 +2,16 @@
 from __future__ import annotations
 
 from contextlib import contextmanager
+import datetime as dt
+import logging
 import os
-from typing import Iterator, Sequence, Tuple
+import threading
+import time
+from typing import Dict, Iterator, List, Sequence, Set, Tuple
 
 import mysql.connector
 from mysql.connector import pooling
+from mysql.connector.errors import PoolError
 
 DB_CONFIG = {
     "host": os.getenv("DB_HOST", "localhost"),
@@ -14,120 +19,241 @@ DB_CONFIG = {
     "password": os.getenv("DB_PASSWORD", "timetracker"),
     "database": os.getenv("DB_NAME", "timetracking"),
     "port": int(os.getenv("DB_PORT", "3306")),
+    # The C extension parses result packets in C; fall back to the pure
+    # Python protocol only where the wheel was built without it.
+    "use_pure": os.getenv("DB_USE_PURE", "false").lower() == "true" or not mysql.connector.HAVE_CEXT,
 }
 
-_pool = pooling.MySQLConnectionPool(pool_name="timetracking_pool", pool_size=5, **DB_CONFIG)
+# Sync handlers run in Starlette's worker threads; a pool of 5 was exhausted
+# (PoolError) well before the thread limit under concurrent requests.
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "25"))
+# The connector's pool raises instead of waiting when every connection is
+# checked out, so threads queue on a semaphore for up to this many seconds.
+DB_POOL_TIMEOUT = int(os.getenv("DB_POOL_TIMEOUT", "10"))
+# Checkouts that wait longer than this are logged as a sign the pool is too small.
+DB_POOL_SLOW_ACQUIRE_MS = int(os.getenv("DB_POOL_SLOW_ACQUIRE_MS", "100"))
+
+logger = logging.getLogger(__name__)
+
+_pool = pooling.MySQLConnectionPool(pool_name="timetracking_pool", pool_size=DB_POOL_SIZE, **DB_CONFIG)
+_pool_slots = threading.BoundedSemaphore(DB_POOL_SIZE)
+_schema_ready = False
+
+
+def utc_now() -> dt.datetime:
+    """Current UTC time as a naive datetime, matching the DATETIME columns."""
+    return dt.datetime.now(dt.timezone.utc).replace(tzinfo=None)
+
+
+def open_connection() -> mysql.connector.MySQLConnection:
+    """Open a dedicated connection outside the pool (for long-lived sessions)."""
+    return mysql.connector.connect(**DB_CONFIG)
 
 
 @contextmanager
 def get_connection() -> Iterator[mysql.connector.MySQLConnection]:
-    """Yield a MySQL connection from the pool."""
-    connection = _pool.get_connection()
+    """Yield a MySQL connection from the pool, waiting for a free one if needed."""
+    started = time.perf_counter()
+    if not _pool_slots.acquire(timeout=DB_POOL_TIMEOUT):
+        raise PoolError("Failed getting connection; pool exhausted")
     try:
-        yield connection
+        connection = _pool.get_connection()
+        waited_ms = (time.perf_counter() - started) * 1000
+        if waited_ms > DB_POOL_SLOW_ACQUIRE_MS:
+            logger.warning("Waited %.0f ms for a DB connection (DB_POOL_SIZE=%d)", waited_ms, DB_POOL_SIZE)
+        try:
+            yield connection
+        finally:
+            connection.close()
     finally:
-        connection.close()
-
-
-def _column_exists(cursor: mysql.connector.cursor.MySQLCursor, table: str, column: str) -> bool:
-    cursor.execute(
-        """
-        SELECT COUNT(*)
-        FROM INFORMATION_SCHEMA.COLUMNS
-        WHERE TABLE_SCHEMA = DATABASE()
-          AND TABLE_NAME = %s
-          AND COLUMN_NAME = %s
-        """,
-        (table, column),
-    )
-    return bool(cursor.fetchone()[0])
-
-
-def _index_exists(cursor: mysql.connector.cursor.MySQLCursor, table: str, index: str) -> bool:
-    cursor.execute(
-        """
-        SELECT COUNT(*)
-        FROM INFORMATION_SCHEMA.STATISTICS
-        WHERE TABLE_SCHEMA = DATABASE()
-          AND TABLE_NAME = %s
-          AND INDEX_NAME = %s
-        """,
-        (table, index),
-    )
-    return bool(cursor.fetchone()[0])
-
-def _table_exists(cursor: mysql.connector.cursor.MySQLCursor, table: str) -> bool:
-    cursor.execute(
-        """
-        SELECT COUNT(*)
-        FROM INFORMATION_SCHEMA.TABLES
-        WHERE TABLE_SCHEMA = DATABASE()
-          AND TABLE_NAME = %s
-        """,
-        (table,),
-    )
-    return bool(cursor.fetchone()[0])
-
-
-def _ensure_columns(
-    cursor: mysql.connector.cursor.MySQLCursor,
-    table: str,
-    columns: Sequence[Tuple[str, str]],
-) -> bool:
-    changed = False
-    for column_name, column_def in columns:
-        if _column_exists(cursor, table, column_name):
-            continue
-        cursor.execute(f"ALTER TABLE `{table}` ADD COLUMN `{column_name}` {column_def}")
-        changed = True
-    return changed
+        _pool_slots.release()
+
+
+class _SchemaSnapshot:
+    """Tables, columns, indexes and routines of the current database.
+
+    Read with one query per INFORMATION_SCHEMA view instead of one per check.
+    Names are lower-cased, matching the case-insensitive comparisons the
+    per-name INFORMATION_SCHEMA lookups used to do.
+    """
+
+    def __init__(self, cursor: mysql.connector.cursor.MySQLCursor) -> None:
+        self.columns: Dict[str, Set[str]] = {}
+        self.indexes: Dict[str, Set[str]] = {}
+        cursor.execute(
+            """
+            SELECT TABLE_NAME, COLUMN_NAME
+            FROM INFORMATION_SCHEMA.COLUMNS
+            WHERE TABLE_SCHEMA = DATABASE()
+            """
+        )
+        for table, column in cursor.fetchall():
+            self.columns.setdefault(table.lower(), set()).add(column.lower())
+        cursor.execute(
+            """
+            SELECT DISTINCT TABLE_NAME, INDEX_NAME
+            FROM INFORMATION_SCHEMA.STATISTICS
+            WHERE TABLE_SCHEMA = DATABASE()
+            """
+        )
+        for table, index in cursor.fetchall():
+            self.indexes.setdefault(table.lower(), set()).add(index.lower())
+        cursor.execute(
+            """
+            SELECT ROUTINE_NAME
+            FROM INFORMATION_SCHEMA.ROUTINES
+            WHERE ROUTINE_SCHEMA = DATABASE()
+            """
+        )
+        self.routines: Set[str] = {row[0].lower() for row in cursor.fetchall()}
+
+    def has_table(self, table: str) -> bool:
+        return table.lower() in self.columns
+
+    def has_column(self, table: str, column: str) -> bool:
+        return column.lower() in self.columns.get(table.lower(), ())
+
+    def has_index(self, table: str, index: str) -> bool:
+        return index.lower() in self.indexes.get(table.lower(), ())
+
+    def has_routine(self, routine: str) -> bool:
+        return routine.lower() in self.routines
+
+
+NFC_SCAN_PROCEDURE = """
+CREATE PROCEDURE sp_nfc_scan(
+    IN p_uid VARCHAR(32),
+    IN p_now DATETIME,
+    OUT p_action VARCHAR(16),
+    OUT p_session_id INT,
+    OUT p_user_id INT,
+    OUT p_name VARCHAR(255),
+    OUT p_err VARCHAR(32)
+)
+BEGIN
+    DECLARE v_is_active TINYINT DEFAULT NULL;
+    DECLARE CONTINUE HANDLER FOR NOT FOUND BEGIN END;
+
+    SET p_action = NULL, p_session_id = NULL, p_user_id = NULL, p_name = NULL, p_err = NULL;
+    START TRANSACTION;
+    SELECT id, name, is_active INTO p_user_id, p_name, v_is_active
+    FROM users
+    WHERE nfc_uid = p_uid
+    FOR UPDATE;
+
+    IF p_user_id IS NULL THEN
+        SET p_err = 'unknown_card';
+    ELSEIF NOT v_is_active THEN
+        SET p_err = 'user_disabled';
+    ELSE
+        SELECT id INTO p_session_id
+        FROM sessions
+        WHERE user_id = p_user_id AND end_time IS NULL
+        ORDER BY start_time DESC
+        LIMIT 1;
+        IF p_session_id IS NULL THEN
+            INSERT INTO sessions (user_id, start_time, source) VALUES (p_user_id, p_now, 'nfc');
+            SET p_session_id = LAST_INSERT_ID();
+            SET p_action = 'checked_in';
+        ELSE
+            UPDATE sessions SET end_time = p_now WHERE id = p_session_id;
+            SET p_action = 'checked_out';
+        END IF;
+    END IF;
+    COMMIT;
+END
+"""
+
+
+def _missing_columns(
+    schema: _SchemaSnapshot, table: str, columns: Sequence[Tuple[str, str]]
+) -> List[str]:
+    return [
+        f"ADD COLUMN `{column_name}` {column_def}"
+        for column_name, column_def in columns
+        if not schema.has_column(table, column_name)
+    ]
+
+
+def _missing_indexes(
+    schema: _SchemaSnapshot, table: str, indexes: Sequence[Tuple[str, str]]
+) -> List[str]:
+    return [f"ADD {index_def}" for index_name, index_def in indexes if not schema.has_index(table, index_name)]
+
+
+def _alter_table(cursor: mysql.connector.cursor.MySQLCursor, table: str, clauses: List[str]) -> bool:
+    """Apply all pending changes to ``table`` in a single ALTER (one rebuild)."""
+    if not clauses:
+        return False
+    cursor.execute(f"ALTER TABLE `{table}` " + ", ".join(clauses))
+    return True
 
 
 def ensure_schema() -> None:
     """Ensure required columns and indexes exist for the current app version."""
+    global _schema_ready
+    if _schema_ready:
+        return
     with get_connection() as connection:
         cursor = connection.cursor()
+        schema = _SchemaSnapshot(cursor)
         changed = False
-        changed |= _ensure_columns(
+        changed |= _alter_table(
             cursor,
             "users",
-            (
-                ("department", "VARCHAR(100)"),
-                ("role_title", "VARCHAR(100)"),
-                ("manager_id", "INT"),
-                ("mac_address", "VARCHAR(32)"),
-                ("nfc_uid", "VARCHAR(32)"),
-                ("pay_type", "VARCHAR(16) NOT NULL DEFAULT 'hourly'"),
-                ("hourly_rate", "DECIMAL(10,2)"),
-                ("salary_monthly", "DECIMAL(10,2)"),
-                ("overtime_multiplier", "DECIMAL(4,2) NOT NULL DEFAULT 1.25"),
-                ("tax_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                ("social_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                ("pension_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                ("other_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                ("employer_social_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                ("employer_pension_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                ("employer_other_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                ("payment_method", "VARCHAR(40)"),
-                ("is_active", "TINYINT(1) NOT NULL DEFAULT 1"),
+            _missing_columns(
+                schema,
+                "users",
+                (
+                    ("department", "VARCHAR(100)"),
+                    ("role_title", "VARCHAR(100)"),
+                    ("manager_id", "INT"),
+                    ("mac_address", "VARCHAR(32)"),
+                    ("nfc_uid", "VARCHAR(32)"),
+                    ("pay_type", "VARCHAR(16) NOT NULL DEFAULT 'hourly'"),
+                    ("hourly_rate", "DECIMAL(10,2)"),
+                    ("salary_monthly", "DECIMAL(10,2)"),
+                    ("overtime_multiplier", "DECIMAL(4,2) NOT NULL DEFAULT 1.25"),
+                    ("tax_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                    ("social_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                    ("pension_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                    ("other_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                    ("employer_social_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                    ("employer_pension_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                    ("employer_other_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                    ("payment_method", "VARCHAR(40)"),
+                    ("is_active", "TINYINT(1) NOT NULL DEFAULT 1"),
+                ),
+            )
+            + _missing_indexes(
+                schema,
+                "users",
+                (
+                    ("unique_ldap_username", "UNIQUE INDEX unique_ldap_username (ldap_username)"),
+                    ("uniq_users_nfc_uid", "UNIQUE INDEX uniq_users_nfc_uid (nfc_uid)"),
+                ),
             ),
         )
-        changed |= _ensure_columns(
+        changed |= _alter_table(
             cursor,
             "sessions",
-            (("source", "VARCHAR(16) NOT NULL DEFAULT 'manual'"),),
+            _missing_columns(schema, "sessions", (("source", "VARCHAR(16) NOT NULL DEFAULT 'manual'"),))
+            + _missing_indexes(
+                schema,
+                "sessions",
+                (
+                    ("idx_sessions_user_start", "INDEX idx_sessions_user_start (user_id, start_time)"),
+                    # Open-session lookups (user_id = ? AND end_time IS NULL).
+                    ("idx_sessions_user_open", "INDEX idx_sessions_user_open (user_id, end_time)"),
+                    # Covers the month-wide per-user totals on the admin pages.
+                    (
+                        "idx_sessions_start_user_end",
+                        "INDEX idx_sessions_start_user_end (start_time, user_id, end_time)",
+                    ),
+                ),
+            ),
         )
-        if not _index_exists(cursor, "sessions", "idx_sessions_user_start"):
-            cursor.execute(
-                "ALTER TABLE sessions ADD INDEX idx_sessions_user_start (user_id, start_time)"
-            )
-            changed = True
-        if not _index_exists(cursor, "users", "uniq_users_nfc_uid"):
-            cursor.execute(
-                "ALTER TABLE users ADD UNIQUE INDEX uniq_users_nfc_uid (nfc_uid)"
-            )
-            changed = True
-        if not _table_exists(cursor, "paychecks"):
+        if not schema.has_table("paychecks"):
             cursor.execute(
                 """
                 CREATE TABLE paychecks (
@@ -165,59 +291,76 @@ def ensure_schema() -> None:
                     employer_other_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
                     status VARCHAR(16) NOT NULL DEFAULT 'draft',
                     payment_method VARCHAR(40),
+                    content_hash CHAR(32),
                     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
                     updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
                     UNIQUE KEY uniq_paycheck_period (user_id, period_year, period_month),
+                    INDEX idx_paychecks_year_user (period_year, user_id),
                     FOREIGN KEY (user_id) REFERENCES users(id)
                 )
                 """
             )
             changed = True
         else:
-            changed |= _ensure_columns(
+            changed |= _alter_table(
                 cursor,
                 "paychecks",
-                (
-                    ("period_year", "INT NOT NULL"),
-                    ("period_month", "INT NOT NULL"),
-                    ("pay_date", "DATE NOT NULL"),
-                    ("pay_type", "VARCHAR(16) NOT NULL"),
-                    ("hourly_rate", "DECIMAL(10,2)"),
-                    ("salary_monthly", "DECIMAL(10,2)"),
-                    ("total_hours", "DECIMAL(10,2) NOT NULL DEFAULT 0"),
-                    ("overtime_hours", "DECIMAL(10,2) NOT NULL DEFAULT 0"),
-                    ("overtime_multiplier", "DECIMAL(4,2) NOT NULL DEFAULT 1.25"),
-                    ("base_pay", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("overtime_pay", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("bonus_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("allowance_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("gross_pay", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("tax_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                    ("social_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                    ("pension_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                    ("other_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                    ("tax_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("social_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("pension_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("other_deduction_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("total_deductions", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("net_pay", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("employer_social_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                    ("employer_pension_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                    ("employer_other_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
-                    ("employer_social_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("employer_pension_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("employer_other_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
-                    ("status", "VARCHAR(16) NOT NULL DEFAULT 'draft'"),
-                    ("payment_method", "VARCHAR(40)"),
-                    ("created_at", "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP"),
-                    ("updated_at", "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+                _missing_columns(
+                    schema,
+                    "paychecks",
+                    (
+                        ("period_year", "INT NOT NULL"),
+                        ("period_month", "INT NOT NULL"),
+                        ("pay_date", "DATE NOT NULL"),
+                        ("pay_type", "VARCHAR(16) NOT NULL"),
+                        ("hourly_rate", "DECIMAL(10,2)"),
+                        ("salary_monthly", "DECIMAL(10,2)"),
+                        ("total_hours", "DECIMAL(10,2) NOT NULL DEFAULT 0"),
+                        ("overtime_hours", "DECIMAL(10,2) NOT NULL DEFAULT 0"),
+                        ("overtime_multiplier", "DECIMAL(4,2) NOT NULL DEFAULT 1.25"),
+                        ("base_pay", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("overtime_pay", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("bonus_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("allowance_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("gross_pay", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("tax_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                        ("social_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                        ("pension_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                        ("other_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                        ("tax_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("social_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("pension_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("other_deduction_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("total_deductions", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("net_pay", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("employer_social_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                        ("employer_pension_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                        ("employer_other_rate", "DECIMAL(6,4) NOT NULL DEFAULT 0"),
+                        ("employer_social_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("employer_pension_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("employer_other_amount", "DECIMAL(12,2) NOT NULL DEFAULT 0"),
+                        ("status", "VARCHAR(16) NOT NULL DEFAULT 'draft'"),
+                        ("payment_method", "VARCHAR(40)"),
+                        ("content_hash", "CHAR(32)"),
+                        ("created_at", "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP"),
+                        ("updated_at", "DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP"),
+                    ),
+                )
+                + _missing_indexes(
+                    schema,
+                    "paychecks",
+                    (
+                        (
+                            "uniq_paycheck_period",
+                            "UNIQUE INDEX uniq_paycheck_period (user_id, period_year, period_month)",
+                        ),
+                        ("idx_paychecks_year_user", "INDEX idx_paychecks_year_user (period_year, user_id)"),
+                    ),
                 ),
             )
-            if not _index_exists(cursor, "paychecks", "uniq_paycheck_period"):
-                cursor.execute(
-                    "ALTER TABLE paychecks ADD UNIQUE INDEX uniq_paycheck_period (user_id, period_year, period_month)"
-                )
-                changed = True
+        if not schema.has_routine("sp_nfc_scan"):
+            cursor.execute(NFC_SCAN_PROCEDURE)
+            changed = True
         if changed:
             connection.commit()
+    _schema_ready = True
@@ -0,0 +1,63 @@
+"""Load deployment settings from .env files into os.environ."""
+from __future__ import annotations
+
+import os
+from typing import Dict, Iterable, Tuple
+
+ENV_FILES = ("/opt/timetracking/.env", ".env")
+
+_ENV_FILE_CACHE: Dict[Tuple[str, int], Dict[str, str]] = {}
+
+
+def _parse_env_file(path: str) -> Dict[str, str]:
+    values: Dict[str, str] = {}
+    try:
+        with open(path, "r", encoding="utf-8") as handle:
+            for raw_line in handle:
+                line = raw_line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                if line.startswith("export "):
+                    line = line[7:].strip()
+                if "=" not in line:
+                    continue
+                key, value = line.split("=", 1)
+                key = key.strip()
+                value = value.strip()
+                if not key:
+                    continue
+                if (
+                    len(value) >= 2
+                    and value[0] == value[-1]
+                    and value[0] in {"'", '"'}
+                ):
+                    value = value[1:-1]
+                values.setdefault(key, value)
+    except OSError:
+        return {}
+    return values
+
+
+def _load_env_file(path: str) -> Dict[str, str]:
+    try:
+        mtime_ns = os.stat(path).st_mtime_ns
+    except OSError:
+        return {}
+    cache_key = (path, mtime_ns)
+    values = _ENV_FILE_CACHE.get(cache_key)
+    if values is None:
+        values = _parse_env_file(path)
+        _ENV_FILE_CACHE[cache_key] = values
+    return values
+
+
+def load_env_files(paths: Iterable[str] = ENV_FILES) -> Dict[str, str]:
+    """Apply the files' values without overriding real environment variables."""
+    for path in paths:
+        for key, value in _load_env_file(path).items():
+            os.environ.setdefault(key, value)
+    return dict(os.environ)
+
+
+# Loaded on import, so entry points import this module before db reads DB_*.
+ENV_SNAPSHOT = load_env_files()
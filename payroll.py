@@ -0,0 +1,80 @@
+"""Payroll arithmetic on integers (cents, basis points, exact hour fractions)."""
+from __future__ import annotations
+
+from decimal import Decimal
+from fractions import Fraction
+from typing import Tuple
+
+# Hour totals are stored hundredths or unrounded seconds / 3600 (computed as a
+# 28-digit Decimal); every such value has a denominator dividing this.
+HOURS_MAX_DENOMINATOR = 3600 * 100
+
+
+def div_round_half_up(numerator: int, denominator: int) -> int:
+    """numerator / denominator rounded half away from zero, like ROUND_HALF_UP."""
+    quotient, remainder = divmod(abs(numerator), denominator)
+    if remainder * 2 >= denominator:
+        quotient += 1
+    return quotient if numerator >= 0 else -quotient
+
+
+def hours_fraction(total_hours: Decimal) -> Tuple[int, int]:
+    """Exact (numerator, denominator) of an hour total, undoing Decimal truncation."""
+    fraction = Fraction(total_hours).limit_denominator(HOURS_MAX_DENOMINATOR)
+    return fraction.numerator, fraction.denominator
+
+
+def calculate_payroll_amounts_cents(
+    pay_type: str,
+    hourly_rate_cents: int,
+    salary_monthly_cents: int,
+    total_hours_numerator: int,
+    total_hours_denominator: int,
+    overtime_hours_hundredths: int,
+    overtime_multiplier_hundredths: int,
+    bonus_cents: int,
+    allowance_cents: int,
+    tax_bp: int,
+    social_bp: int,
+    pension_bp: int,
+    other_bp: int,
+    employer_social_bp: int,
+    employer_pension_bp: int,
+    employer_other_bp: int,
+) -> dict:
+    """Payslip amounts in cents.
+
+    Worked hours are the exact fraction numerator / denominator, so a stored
+    total (hundredths) and an unrounded preview total (e.g. seconds / 3600)
+    are both priced without intermediate rounding. Gross is kept exact over
+    a common denominator and every amount is rounded half-up to cents once.
+    """
+    hours_unit = total_hours_denominator
+    # Gross in cents is gross_scaled / scale.
+    scale = hours_unit * 10_000
+    if pay_type == "salary":
+        base_scaled = salary_monthly_cents * scale
+    else:
+        base_scaled = hourly_rate_cents * total_hours_numerator * 10_000
+    overtime_rate_raw = hourly_rate_cents * overtime_multiplier_hundredths if hourly_rate_cents > 0 else 0
+    overtime_raw = overtime_hours_hundredths * overtime_rate_raw
+    gross_scaled = base_scaled + overtime_raw * hours_unit + (bonus_cents + allowance_cents) * scale
+
+    deduction_bp = tax_bp + social_bp + pension_bp + other_bp
+    rate_scale = scale * 10_000
+
+    return {
+        "base_pay": div_round_half_up(base_scaled, scale),
+        "overtime_rate": div_round_half_up(overtime_rate_raw, 100),
+        "overtime_pay": div_round_half_up(overtime_raw, 10_000),
+        "gross_pay": div_round_half_up(gross_scaled, scale),
+        "tax_amount": div_round_half_up(gross_scaled * tax_bp, rate_scale),
+        "social_amount": div_round_half_up(gross_scaled * social_bp, rate_scale),
+        "pension_amount": div_round_half_up(gross_scaled * pension_bp, rate_scale),
+        "other_deduction_amount": div_round_half_up(gross_scaled * other_bp, rate_scale),
+        "total_deductions": div_round_half_up(gross_scaled * deduction_bp, rate_scale),
+        "net_pay": div_round_half_up(gross_scaled * (10_000 - deduction_bp), rate_scale),
+        "employer_social_amount": div_round_half_up(gross_scaled * employer_social_bp, rate_scale),
+        "employer_pension_amount": div_round_half_up(gross_scaled * employer_pension_bp, rate_scale),
+        "employer_other_amount": div_round_half_up(gross_scaled * employer_other_bp, rate_scale),
+    }
@@ -33,7 +33,9 @@ CREATE TABLE sessions (
     source VARCHAR(16) NOT NULL DEFAULT 'manual',
     note TEXT,
     FOREIGN KEY (user_id) REFERENCES users(id),
-    INDEX idx_sessions_user_start (user_id, start_time)
+    INDEX idx_sessions_user_start (user_id, start_time),
+    INDEX idx_sessions_user_open (user_id, end_time),
+    INDEX idx_sessions_start_user_end (start_time, user_id, end_time)
 );
 
 CREATE TABLE paychecks (
@@ -71,8 +73,10 @@ CREATE TABLE paychecks (
     employer_other_amount DECIMAL(12,2) NOT NULL DEFAULT 0,
     status VARCHAR(16) NOT NULL DEFAULT 'draft',
     payment_method VARCHAR(40),
+    content_hash CHAR(32),
     created_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
     updated_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
     UNIQUE KEY uniq_paycheck_period (user_id, period_year, period_month),
+    INDEX idx_paychecks_year_user (period_year, user_id),
     FOREIGN KEY (user_id) REFERENCES users(id)
 );
@@ -0,0 +1,200 @@
+"""Lightweight signed-cookie session middleware (pure ASGI)."""
+from __future__ import annotations
+
+import json
+import threading
+import time
+from base64 import b64decode, b64encode
+from collections import OrderedDict
+from collections.abc import MutableMapping
+from typing import Any, Iterator, Optional
+
+from itsdangerous import BadSignature, TimestampSigner
+
+VERIFIED_COOKIE_CACHE_SIZE = 1024
+
+
+def _read_cookie(scope: dict, name: str) -> Optional[bytes]:
+    for header_name, header_value in scope.get("headers", ()):
+        if header_name != b"cookie":
+            continue
+        for chunk in header_value.split(b";"):
+            key, sep, value = chunk.strip().partition(b"=")
+            if sep and key.decode("latin-1") == name:
+                return value
+    return None
+
+
+class VerifiedCookieCache:
+    """LRU of cookies that already passed signature verification.
+
+    Maps the raw cookie value to its signing time and decoded payload, so
+    repeat requests with the same cookie skip HMAC, base64 and JSON work.
+    Sync handlers load the session from Starlette's worker threads, so
+    access is guarded by a lock.
+    """
+
+    def __init__(self, maxsize: int = VERIFIED_COOKIE_CACHE_SIZE) -> None:
+        self.maxsize = maxsize
+        self._entries: OrderedDict[bytes, tuple[float, dict]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, raw_cookie: bytes, max_age: Optional[int]) -> Optional[dict]:
+        with self._lock:
+            entry = self._entries.get(raw_cookie)
+            if entry is None:
+                return None
+            signed_at, data = entry
+            if max_age is not None and time.time() - signed_at > max_age:
+                del self._entries[raw_cookie]
+                return None
+            self._entries.move_to_end(raw_cookie)
+        return dict(data)
+
+    def put(self, raw_cookie: bytes, signed_at: float, data: dict) -> None:
+        entry = (signed_at, dict(data))
+        with self._lock:
+            self._entries[raw_cookie] = entry
+            self._entries.move_to_end(raw_cookie)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+
+class LazySession(MutableMapping):
+    """Session dict that only verifies and decodes the cookie on first access."""
+
+    def __init__(
+        self,
+        raw_cookie: Optional[bytes],
+        signer: TimestampSigner,
+        max_age: Optional[int],
+        verified: Optional[VerifiedCookieCache] = None,
+    ) -> None:
+        self._raw_cookie = raw_cookie
+        self._signer = signer
+        self._max_age = max_age
+        self._verified = verified
+        self._data: Optional[dict] = None
+        self.dirty = False
+
+    @property
+    def had_cookie(self) -> bool:
+        return self._raw_cookie is not None
+
+    def _load(self) -> dict:
+        if self._data is None:
+            data: Optional[dict] = None
+            raw_cookie = self._raw_cookie
+            if raw_cookie is not None and self._verified is not None:
+                data = self._verified.get(raw_cookie, self._max_age)
+            if data is None:
+                data = {}
+                if raw_cookie is not None:
+                    try:
+                        payload, signed_at = self._signer.unsign(
+                            raw_cookie, max_age=self._max_age, return_timestamp=True
+                        )
+                        loaded = json.loads(b64decode(payload))
+                        if isinstance(loaded, dict):
+                            data = loaded
+                            if self._verified is not None:
+                                self._verified.put(raw_cookie, signed_at.timestamp(), data)
+                    except (BadSignature, ValueError):
+                        data = {}
+            self._data = data
+        return self._data
+
+    def __getitem__(self, key: str) -> Any:
+        return self._load()[key]
+
+    def __setitem__(self, key: str, value: Any) -> None:
+        self._load()[key] = value
+        self.dirty = True
+
+    def __delitem__(self, key: str) -> None:
+        del self._load()[key]
+        self.dirty = True
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._load())
+
+    def __len__(self) -> int:
+        return len(self._load())
+
+    def get(self, key: str, default: Any = None) -> Any:
+        return self._load().get(key, default)
+
+    def clear(self) -> None:
+        self._load().clear()
+        self.dirty = True
+
+    def encode(self, signer: TimestampSigner) -> bytes:
+        data = self._load()
+        signed_at = time.time()
+        cookie = signer.sign(b64encode(json.dumps(data).encode("utf-8")))
+        if self._verified is not None:
+            self._verified.put(cookie, signed_at, data)
+        return cookie
+
+
+class FastSessionMiddleware:
+    """Drop-in replacement for Starlette's SessionMiddleware.
+
+    The cookie format is identical, but the cookie is only decoded when a
+    handler touches ``request.session`` and Set-Cookie is only emitted when
+    the session was modified. Cookies that already verified are remembered
+    in a small LRU, so polling clients pay for the HMAC check once.
+    """
+
+    def __init__(
+        self,
+        app,
+        secret_key: str,
+        session_cookie: str = "session",
+        max_age: Optional[int] = 14 * 24 * 60 * 60,
+        path: str = "/",
+        same_site: str = "lax",
+        https_only: bool = False,
+        skip_prefixes: tuple = ("/static",),
+    ) -> None:
+        self.app = app
+        self.signer = TimestampSigner(str(secret_key))
+        self.session_cookie = session_cookie
+        self.max_age = max_age
+        self.path = path
+        self.skip_prefixes = skip_prefixes
+        self.verified = VerifiedCookieCache()
+        self.security_flags = "httponly; samesite=" + same_site
+        if https_only:
+            self.security_flags += "; secure"
+
+    async def __call__(self, scope, receive, send) -> None:
+        if scope["type"] != "http" or scope["path"].startswith(self.skip_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        session = LazySession(
+            _read_cookie(scope, self.session_cookie), self.signer, self.max_age, self.verified
+        )
+        scope["session"] = session
+
+        async def send_wrapper(message) -> None:
+            if message["type"] == "http.response.start" and session.dirty:
+                header_value = self._cookie_header(session)
+                if header_value is not None:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"set-cookie", header_value.encode("latin-1")))
+                    message["headers"] = headers
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    def _cookie_header(self, session: LazySession) -> Optional[str]:
+        if len(session):
+            max_age = f"Max-Age={self.max_age}; " if self.max_age else ""
+            data = session.encode(self.signer).decode("utf-8")
+            return f"{self.session_cookie}={data}; path={self.path}; {max_age}{self.security_flags}"
+        if session.had_cookie:
+            expires = "expires=Thu, 01 Jan 1970 00:00:00 GMT; "
+            return f"{self.session_cookie}=null; path={self.path}; {expires}{self.security_flags}"
+        return None
@@ -0,0 +1,277 @@
+"""payroll.calculate_payroll_amounts_cents against the original Decimal implementation."""
+from __future__ import annotations
+
+import math
+import random
+from decimal import ROUND_HALF_UP, Decimal
+from fractions import Fraction
+
+import pytest
+
+from payroll import calculate_payroll_amounts_cents, div_round_half_up, hours_fraction
+
+_RATE_NAMES = (
+    "tax_rate",
+    "social_rate",
+    "pension_rate",
+    "other_rate",
+    "employer_social_rate",
+    "employer_pension_rate",
+    "employer_other_rate",
+)
+
+
+def _round_money(value: Decimal) -> Decimal:
+    return value.quantize(Decimal("0.01"), rounding=ROUND_HALF_UP)
+
+
+def _unrounded_amounts(
+    pay_type: str,
+    hourly_rate,
+    salary_monthly,
+    total_hours,
+    overtime_hours,
+    overtime_multiplier,
+    bonus_amount,
+    allowance_amount,
+    tax_rate,
+    social_rate,
+    pension_rate,
+    other_rate,
+    employer_social_rate,
+    employer_pension_rate,
+    employer_other_rate,
+) -> dict:
+    # The formulas of the Decimal implementation the integer code replaced
+    # (chunk0-10), which rounded each of these results to cents at the end.
+    # Works on Decimals (the old behaviour) and on Fractions (exact values).
+    base_pay = salary_monthly if pay_type == "salary" else hourly_rate * total_hours
+    overtime_rate = hourly_rate * overtime_multiplier if hourly_rate > 0 else 0 * hourly_rate
+    overtime_pay = overtime_hours * overtime_rate
+    gross_pay = base_pay + overtime_pay + bonus_amount + allowance_amount
+
+    tax_amount = gross_pay * tax_rate
+    social_amount = gross_pay * social_rate
+    pension_amount = gross_pay * pension_rate
+    other_deduction_amount = gross_pay * other_rate
+
+    total_deductions = tax_amount + social_amount + pension_amount + other_deduction_amount
+    net_pay = gross_pay - total_deductions
+
+    return {
+        "base_pay": base_pay,
+        "overtime_rate": overtime_rate,
+        "overtime_pay": overtime_pay,
+        "gross_pay": gross_pay,
+        "tax_amount": tax_amount,
+        "social_amount": social_amount,
+        "pension_amount": pension_amount,
+        "other_deduction_amount": other_deduction_amount,
+        "total_deductions": total_deductions,
+        "net_pay": net_pay,
+        "employer_social_amount": gross_pay * employer_social_rate,
+        "employer_pension_amount": gross_pay * employer_pension_rate,
+        "employer_other_amount": gross_pay * employer_other_rate,
+    }
+
+
+def _cents(value: Decimal) -> int:
+    return int(value.scaleb(2).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _bp(value: Decimal) -> int:
+    return int(value.scaleb(4).to_integral_value(rounding=ROUND_HALF_UP))
+
+
+def _integer_amounts(inputs: dict) -> dict:
+    # Same conversions as app.py: money and hours in hundredths, rates in bp,
+    # worked hours as an exact fraction.
+    numerator, denominator = hours_fraction(inputs["total_hours"])
+    return calculate_payroll_amounts_cents(
+        pay_type=inputs["pay_type"],
+        hourly_rate_cents=_cents(inputs["hourly_rate"]),
+        salary_monthly_cents=_cents(inputs["salary_monthly"]),
+        total_hours_numerator=numerator,
+        total_hours_denominator=denominator,
+        overtime_hours_hundredths=_cents(inputs["overtime_hours"]),
+        overtime_multiplier_hundredths=_cents(inputs["overtime_multiplier"]),
+        bonus_cents=_cents(inputs["bonus_amount"]),
+        allowance_cents=_cents(inputs["allowance_amount"]),
+        **{name.replace("_rate", "_bp"): _bp(inputs[name]) for name in _RATE_NAMES},
+    )
+
+
+def _reference_cents(inputs: dict) -> dict:
+    """Old Decimal results, in cents."""
+    return {key: _cents(_round_money(value)) for key, value in _unrounded_amounts(**inputs).items()}
+
+
+def _exact_values(inputs: dict) -> dict:
+    """Exact results in cents, before rounding."""
+    exact_inputs = {key: value if key == "pay_type" else Fraction(value) for key, value in inputs.items()}
+    # Preview hours are seconds / 3600; use that exact fraction, not the
+    # 28-digit Decimal quotient.
+    exact_inputs["total_hours"] = Fraction(*hours_fraction(inputs["total_hours"]))
+    return {key: value * 100 for key, value in _unrounded_amounts(**exact_inputs).items()}
+
+
+def _half_up(value: Fraction) -> int:
+    magnitude = math.floor(abs(value) + Fraction(1, 2))
+    return magnitude if value >= 0 else -magnitude
+
+
+def _inputs(**overrides) -> dict:
+    inputs = {
+        "pay_type": "hourly",
+        "hourly_rate": Decimal("0"),
+        "salary_monthly": Decimal("0"),
+        "total_hours": Decimal("0"),
+        "overtime_hours": Decimal("0"),
+        "overtime_multiplier": Decimal("1.25"),
+        "bonus_amount": Decimal("0"),
+        "allowance_amount": Decimal("0"),
+    }
+    inputs.update({name: Decimal("0") for name in _RATE_NAMES})
+    inputs.update(overrides)
+    return inputs
+
+
+def _money(rng: random.Random, high: int) -> Decimal:
+    return Decimal(rng.randint(0, high * 100)).scaleb(-2)
+
+
+def _random_inputs(rng: random.Random, unrounded_hours: bool) -> dict:
+    # Values at the precision of the DECIMAL columns they come from.
+    if unrounded_hours:
+        total_hours = Decimal(rng.randint(0, 250 * 3600)) / Decimal(3600)
+    else:
+        total_hours = Decimal(rng.randint(0, 25_000)).scaleb(-2)
+    return _inputs(
+        pay_type=rng.choice(("hourly", "salary")),
+        hourly_rate=_money(rng, 200),
+        salary_monthly=_money(rng, 20_000),
+        total_hours=total_hours,
+        overtime_hours=Decimal(rng.randint(0, 6_000)).scaleb(-2),
+        overtime_multiplier=Decimal(rng.randint(100, 300)).scaleb(-2),
+        bonus_amount=_money(rng, 5_000),
+        allowance_amount=_money(rng, 1_000),
+        **{name: Decimal(rng.randint(0, 3_000)).scaleb(-4) for name in _RATE_NAMES},
+    )
+
+
+def test_matches_decimal_reference_on_random_inputs():
+    # Inputs at database precision: the old Decimal code was exact here.
+    rng = random.Random(20260415)
+    for _ in range(10_000):
+        inputs = _random_inputs(rng, unrounded_hours=False)
+        assert _integer_amounts(inputs) == _reference_cents(inputs), inputs
+
+
+def test_matches_exact_values_on_random_preview_hours():
+    # Previews price seconds / 3600. The old code divided at 28 digits, so it
+    # only deviates where an exact half-cent tie came out just below or above.
+    rng = random.Random(20260416)
+    for _ in range(10_000):
+        inputs = _random_inputs(rng, unrounded_hours=True)
+        amounts = _integer_amounts(inputs)
+        reference = _reference_cents(inputs)
+        for key, exact in _exact_values(inputs).items():
+            assert amounts[key] == _half_up(exact), (key, inputs)
+            if reference[key] != amounts[key]:
+                assert (exact * 2).denominator == 1 and abs(reference[key] - amounts[key]) == 1, (key, inputs)
+
+
+@pytest.mark.parametrize(
+    "overrides, key, expected_cents",
+    [
+        # 0.01 CHF/h * 0.50 h = 0.005 CHF
+        ({"hourly_rate": Decimal("0.01"), "total_hours": Decimal("0.50")}, "base_pay", 1),
+        # 1.00 CHF * 0.50 % = 0.005 CHF
+        ({"bonus_amount": Decimal("1.00"), "tax_rate": Decimal("0.0050")}, "tax_amount", 1),
+        # 0.01 CHF/h * 1.50 = 0.015 CHF/h
+        ({"hourly_rate": Decimal("0.01"), "overtime_multiplier": Decimal("1.50")}, "overtime_rate", 2),
+        # 1.00 CHF - 0.50 % deductions = 0.995 CHF
+        ({"bonus_amount": Decimal("1.00"), "social_rate": Decimal("0.0050")}, "net_pay", 100),
+        # 0.01 CHF/h * 0.01 h = 0.0001 CHF, below half a cent
+        ({"hourly_rate": Decimal("0.01"), "total_hours": Decimal("0.01")}, "base_pay", 0),
+    ],
+)
+def test_half_cent_ties_round_up(overrides, key, expected_cents):
+    inputs = _inputs(**overrides)
+    amounts = _integer_amounts(inputs)
+    assert amounts[key] == expected_cents
+    assert amounts == _reference_cents(inputs)
+
+
+def test_salary_ignores_worked_hours():
+    inputs = _inputs(
+        pay_type="salary",
+        hourly_rate=Decimal("40.00"),
+        salary_monthly=Decimal("6500.00"),
+        total_hours=Decimal("170.25"),
+        overtime_hours=Decimal("4.00"),
+    )
+    amounts = _integer_amounts(inputs)
+    assert amounts["base_pay"] == 650_000
+    # Overtime is still paid at the hourly rate.
+    assert amounts["overtime_pay"] == 20_000
+    assert amounts["gross_pay"] == 670_000
+    assert amounts == _reference_cents(inputs)
+
+
+def test_hourly_pays_worked_hours():
+    inputs = _inputs(
+        hourly_rate=Decimal("32.50"),
+        salary_monthly=Decimal("6500.00"),
+        total_hours=Decimal("160.00"),
+    )
+    amounts = _integer_amounts(inputs)
+    assert amounts["base_pay"] == 520_000
+    assert amounts == _reference_cents(inputs)
+
+
+def test_zero_rates_deduct_nothing():
+    inputs = _inputs(
+        hourly_rate=Decimal("25.00"),
+        total_hours=Decimal("100.00"),
+        bonus_amount=Decimal("150.00"),
+        allowance_amount=Decimal("50.00"),
+    )
+    amounts = _integer_amounts(inputs)
+    assert amounts["gross_pay"] == 270_000
+    assert amounts["net_pay"] == amounts["gross_pay"]
+    for key in ("tax_amount", "social_amount", "pension_amount", "other_deduction_amount", "total_deductions"):
+        assert amounts[key] == 0
+    assert amounts == _reference_cents(inputs)
+
+
+def test_zero_hourly_rate_has_no_overtime():
+    inputs = _inputs(pay_type="salary", salary_monthly=Decimal("5000.00"), overtime_hours=Decimal("10.00"))
+    amounts = _integer_amounts(inputs)
+    assert amounts["overtime_rate"] == 0
+    assert amounts["overtime_pay"] == 0
+    assert amounts == _reference_cents(inputs)
+
+
+def test_unrounded_preview_hours_are_not_rounded_first():
+    # Rounding 10.3389 h to 10.34 h first would give 470.99 CHF.
+    inputs = _inputs(hourly_rate=Decimal("45.55"), total_hours=Decimal("10.3389"))
+    amounts = _integer_amounts(inputs)
+    assert amounts["base_pay"] == 47_094
+    assert amounts == _reference_cents(inputs)
+
+
+def test_preview_hours_from_seconds():
+    inputs = _inputs(
+        hourly_rate=Decimal("45.55"),
+        total_hours=Decimal(37_220) / Decimal(3600),
+        tax_rate=Decimal("0.0765"),
+    )
+    assert _integer_amounts(inputs) == _reference_cents(inputs)
+
+
+def test_div_round_half_up_is_symmetric():
+    assert div_round_half_up(5, 10) == 1
+    assert div_round_half_up(-5, 10) == -1
+    assert div_round_half_up(4, 10) == 0
+    assert div_round_half_up(-4, 10) == 0